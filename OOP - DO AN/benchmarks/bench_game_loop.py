@@ -0,0 +1,200 @@
+"""
+Game loop benchmarks for When Cows Fly
+Drives the headless GameWorld through fixed, seeded scenarios and reports
+time per tick, step-time percentiles and allocation pressure.
+
+Run from the game folder:
+    python -m benchmarks.bench_game_loop
+    python -m benchmarks.bench_game_loop --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_game_loop --baseline benchmarks/baseline.json
+
+With --baseline the exit code is 1 if any scenario regressed by more than
+--tolerance (default 15%) in mean or p99 step time.
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from operator import attrgetter
+
+from utils.game_world import GameWorld
+from utils.game_loop import FixedStepLoop
+from utils.swarm_store import numpy_available
+
+WORLD_SIZE = (540, 960)
+TICK_RATE = 60
+DEFAULT_TICKS = 3000
+DEFAULT_TOLERANCE = 0.15
+
+# Obstacles used to fill the fixed-population scenarios; no wire, so the
+# run never ends early
+FILL_TYPES = ['hole', 'kite', 'barrier', 'bird']
+
+
+class Scenario:
+    """A seeded world setup plus the inputs it receives every tick"""
+
+    def __init__(self, name, seed=1, jump_every=80, score=0, population=None, swarm=False):
+        self.name = name
+        self.seed = seed
+        self.jump_every = jump_every
+        self.score = score
+        self.population = population
+        self.swarm = swarm
+
+    def setup(self):
+        world = GameWorld(*WORLD_SIZE)
+        world.set_swarm(self.swarm)
+        self.restart(world)
+        return world, FixedStepLoop(world, TICK_RATE)
+
+    def restart(self, world):
+        world.reset(seed=self.seed)
+        world.score = self.score
+        if self.population is None:
+            world.spawn_obstacle('electric_wire')
+        else:
+            # Fixed population: the cow cannot run out of lives
+            world.lives = 10 ** 9
+            rng = random.Random(self.seed)
+            for _ in range(self.population):
+                obstacle = world.spawn_obstacle(rng.choice(FILL_TYPES))
+                obstacle.x = rng.uniform(0, world.width)
+                obstacle.save_position()
+            # spawn_obstacle() inserted the holes at the right edge; moving
+            # them broke the sort-by-x order the hole checks rely on
+            world.holes.sort(key=attrgetter('x'))
+
+    def before_tick(self, world, loop):
+        """Feed inputs and keep the scenario in its steady state (untimed)"""
+        if world.is_over:
+            self.seed += 1
+            self.restart(world)
+        if self.jump_every and loop.tick % self.jump_every == 0:
+            loop.push_input('jump')
+        if self.population is not None:
+            missing = self.population - len(world.obstacles)
+            for _ in range(missing):
+                world.spawn_obstacle(world.rng.choice(FILL_TYPES))
+
+
+def default_scenarios():
+    scenarios = [
+        Scenario('idle', jump_every=0),
+        Scenario('normal_spawn'),
+        Scenario('max_difficulty', score=300),
+        Scenario('entities_10', population=10),
+        Scenario('entities_100', population=100),
+        Scenario('entities_1000', population=1000),
+    ]
+    if numpy_available():
+        scenarios.append(Scenario('swarm', swarm=True))
+    return scenarios
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, ticks):
+    """Time every tick, then repeat the run under tracemalloc for allocations"""
+    world, loop = scenario.setup()
+    samples = []
+    gc_before = gc.get_stats()[0]['collections']
+    clock = time.perf_counter_ns
+    for _ in range(ticks):
+        scenario.before_tick(world, loop)
+        start = clock()
+        loop.run_tick()
+        samples.append(clock() - start)
+    gc_collections = gc.get_stats()[0]['collections'] - gc_before
+
+    world, loop = scenario.setup()
+    alloc_ticks = min(ticks, 500)
+    transient = 0
+    tracemalloc.start()
+    for _ in range(alloc_ticks):
+        scenario.before_tick(world, loop)
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        loop.run_tick()
+        transient += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        'ticks': ticks,
+        'ns_per_tick': sum(samples) // len(samples),
+        'p50_ns': percentile(samples, 0.50),
+        'p95_ns': percentile(samples, 0.95),
+        'p99_ns': percentile(samples, 0.99),
+        'alloc_peak_bytes_per_tick': transient // alloc_ticks,
+        'gc_gen0_per_1k_ticks': round(gc_collections * 1000 / ticks, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Scenario names whose mean or p99 tick time regressed beyond tolerance"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        for key in ('ns_per_tick', 'p99_ns'):
+            if base[key] and result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {base[key]} -> {result[key]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the headless game loop")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS)
+    parser.add_argument('--only', nargs='*', help="scenario names to run")
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--baseline', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'scenario':<16}{'ns/tick':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'alloc B/tick':>14}{'gc0/1k':>8}")
+    for scenario in default_scenarios():
+        if args.only and scenario.name not in args.only:
+            continue
+        result = run_scenario(scenario, args.ticks)
+        results[scenario.name] = result
+        print(f"{scenario.name:<16}{result['ns_per_tick']:>10}{result['p50_ns']:>10}"
+              f"{result['p95_ns']:>10}{result['p99_ns']:>10}"
+              f"{result['alloc_peak_bytes_per_tick']:>14}{result['gc_gen0_per_1k_ticks']:>8}")
+
+    report = {
+        'python': sys.version.split()[0],
+        'tick_rate': TICK_RATE,
+        'scenarios': results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("REGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
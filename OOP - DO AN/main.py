@@ -5,59 +5,83 @@ Main entry point for the application
 """
 
 import os
-import sys
+import time
+
+# Imported first so it can time every other import
+from utils.startup_profiler import startup_profiler
+# WHENCOWSFLY_STARTUP_PROFILE=1 writes a startup time report
+if os.environ.get('WHENCOWSFLY_STARTUP_PROFILE'):
+    startup_profiler.start()
+
 from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager
 from kivy.core.window import Window
-Window.size = (Window.system_size[0], Window.system_size[1])
-
 from kivy.logger import Logger
-from kivy.clock import Clock
+from kivy.utils import platform
 
-# Import our custom screens
-from screens.main_menu_screen import MainMenuScreen
-from screens.game_screen import GameScreen
-from screens.shop_screen import ShopScreen
-from screens.game_over_screen import GameOverScreen
-from screens.tutorial_screen import TutorialScreen
-from screens.settings_screen import SettingsScreen
+# Screens are imported by the screen manager when first shown
+from screens.lazy_screen_manager import LazyScreenManager
 
 # Import utilities
 from utils.data_manager import DataManager
 from utils.sound_manager import SoundManager
+from utils.tracer import tracer
+from utils.asset_resolver import asset_resolver, resolve_asset
+from utils.texture_cache import texture_cache
+from utils.preloader import Preloader
+
+# Texture budget on phones, where the app is killed in the background if it holds too much
+MOBILE_TEXTURE_BUDGET = 48 * 1024 * 1024
+
+startup_profiler.mark('imports_done')
 
 class WhenCowsFlyApp(App):
     """Main application class for When Cows Fly game"""
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # WHENCOWSFLY_TRACE=1 records a trace of the whole session
+        if os.environ.get('WHENCOWSFLY_TRACE'):
+            tracer.start()
+        self.transition_id = 0
         self.data_manager = DataManager()
         self.sound_manager = SoundManager()
+        self.sound_manager.apply_settings(self.data_manager)
         
     def build(self):
         """Build the main application"""
+        startup_profiler.mark('build_start')
         # Set window size for desktop (will be ignored on mobile)
         Window.size = (540, 960)  # Landscape
-
+        asset_resolver.select_tier(Window.size)
+        if platform in ('android', 'ios'):
+            texture_cache.set_budget(MOBILE_TEXTURE_BUDGET)
         
         # Bind keyboard events
         Window.bind(on_key_down=self.on_key_down)
         
         # Create screen manager
-        self.screen_manager = ScreenManager()
+        self.screen_manager = LazyScreenManager()
         
-        # Add all screens
-        self.screen_manager.add_widget(MainMenuScreen(name='main_menu'))
-        self.screen_manager.add_widget(GameScreen(name='game'))
-        self.screen_manager.add_widget(ShopScreen(name='shop'))
-        self.screen_manager.add_widget(GameOverScreen(name='game_over'))
-        self.screen_manager.add_widget(TutorialScreen(name='tutorial'))
-        self.screen_manager.add_widget(SettingsScreen(name='settings'))
+        # Register all screens; each is built the first time it is shown
+        self.screen_manager.register('loading', 'screens.loading_screen.LoadingScreen')
+        self.screen_manager.register('main_menu', 'screens.main_menu_screen.MainMenuScreen')
+        self.screen_manager.register('game', 'screens.game_screen.GameScreen')
+        self.screen_manager.register('shop', 'screens.shop_screen.ShopScreen')
+        self.screen_manager.register('game_over', 'screens.game_over_screen.GameOverScreen')
+        self.screen_manager.register('tutorial', 'screens.tutorial_screen.TutorialScreen', release_on_leave=True)
+        self.screen_manager.register('settings', 'screens.settings_screen.SettingsScreen')
         
-        # Set initial screen
-        self.screen_manager.current = 'main_menu'
+        # Set initial screen; it shows until assets are preloaded
+        self.screen_manager.current = 'loading'
+        # Build the menu while assets load; it only shows preloaded textures
+        self.screen_manager.prewarm(['main_menu'])
+
+        # Trace screen transitions from the switch until the animation ends
+        self.screen_manager.bind(current=self.on_screen_change)
+        self.screen_manager.transition.bind(on_complete=self.on_transition_complete)
         
         Logger.info("WhenCowsFly: Application built successfully")
+        startup_profiler.mark('build_done')
         return self.screen_manager
     
     def on_key_down(self, window, key, scancode, codepoint, modifier):
@@ -71,9 +95,54 @@ class WhenCowsFlyApp(App):
         # Back button handling for Android
         elif key == 27:  # Escape/Back button
             return self.on_back_button()
+
+        # F5 starts a trace recording, or stops it and writes the trace file
+        elif key == 286:
+            self.toggle_trace()
+
+        # Frame profiler: F3 toggles the overlay, F4 dumps recorded frames
+        elif key in (284, 285):
+            current_screen = self.screen_manager.get_screen(self.screen_manager.current)
+            if key == 284 and hasattr(current_screen, 'toggle_profiler'):
+                current_screen.toggle_profiler()
+            elif key == 285 and hasattr(current_screen, 'dump_profile'):
+                current_screen.dump_profile()
         
         return False
     
+    def on_screen_change(self, manager, name):
+        if tracer.enabled:
+            self.transition_id += 1
+            tracer.async_begin(f'transition to {name}', self.transition_id, 'screen')
+
+    def on_transition_complete(self, transition):
+        if tracer.enabled and self.transition_id:
+            tracer.async_end(f'transition to {self.screen_manager.current}', self.transition_id, 'screen')
+
+    def toggle_trace(self):
+        """Start recording a trace, or stop and save the current one"""
+        if not tracer.enabled:
+            tracer.start()
+            Logger.info("WhenCowsFly: Trace recording started")
+        else:
+            self.save_trace()
+
+    def save_trace(self):
+        tracer.stop()
+        path = self.data_manager.data_dir('traces', time.strftime('trace_%Y%m%d_%H%M%S.json'))
+        try:
+            tracer.save(path)
+            Logger.info(f"WhenCowsFly: Trace written to {path}")
+        except OSError as e:
+            Logger.error(f"WhenCowsFly: Could not write trace: {e}")
+
+    def save_startup_report(self):
+        path = self.data_manager.data_dir('startup', time.strftime('startup_%Y%m%d_%H%M%S.json'))
+        try:
+            startup_profiler.save(path)
+        except OSError as e:
+            Logger.error(f"WhenCowsFly: Could not write startup report: {e}")
+
     def on_back_button(self):
         """Handle back button press (Android)"""
         current = self.screen_manager.current
@@ -96,20 +165,54 @@ class WhenCowsFlyApp(App):
     def on_start(self):
         """Called when the app starts"""
         Logger.info("WhenCowsFly: App started")
-        # Load saved data
-        self.data_manager.load_data()
-        # Initialize sound manager
-        self.sound_manager.load_sounds()
+        startup_profiler.mark('on_start')
+        startup_profiler.mark_next_frame('first_frame')
+        # Saved data is loaded by DataManager(); sounds and first-screen
+        # textures load in the background behind the loading screen
+        self.preload_assets()
+
+    def preload_assets(self):
+        dm = self.data_manager
+        skin_id = dm.get_equipped_skin()
+        bg_id = dm.get_equipped_background()
+        images = [f"assets/images/characters/{skin_id or 'bo_0'}.png", "assets/images/ground/ground_1.png"]
+        if bg_id:
+            images.append(f"assets/images/backgrounds/{bg_id}.png")
+        else:
+            # Menu and game fall back to different backgrounds
+            images += ["assets/images/backgrounds/background_1.png", "assets/images/backgrounds/background_menu.png"]
+
+        preloader = Preloader()
+        for path in images:
+            source = resolve_asset(path)
+            preloader.add(os.path.basename(path), lambda s=source: texture_cache.decode(s),
+                          lambda image, s=source: texture_cache.adopt(s, image))
+        preloader.add('sounds', self.sound_manager.load_sounds)
+        preloader.add('music', self.sound_manager.load_background_music)
+
+        loading_screen = self.screen_manager.get_screen('loading')
+        preloader.start(on_progress=loading_screen.set_progress, on_complete=self.on_preload_complete)
+
+    def on_preload_complete(self):
+        startup_profiler.mark('preload_done')
+        self.screen_manager.current = 'main_menu'
+        startup_profiler.mark_next_frame('first_interactive', self.save_startup_report)
+        # The game screen's textures are loaded now, so build it during idle frames
+        self.screen_manager.prewarm(['game'])
         self.sound_manager.play_background_music()
     
     def on_stop(self):
         """Called when the app stops"""
         Logger.info("WhenCowsFly: App stopping")
-        # Save data before closing
-        self.data_manager.save_data()
+        # Write any pending changes before closing
+        self.data_manager.flush()
+        if tracer.enabled:
+            self.save_trace()
     
     def on_pause(self):
         """Called when app is paused (Android)"""
+        # The app may be killed while paused, so don't leave changes pending
+        self.data_manager.flush()
         # Pause the game if currently playing
         if self.screen_manager.current == 'game':
             game_screen = self.screen_manager.get_screen('game')
@@ -3,52 +3,48 @@ Game Screen for When Cows Fly
 Main gameplay screen with cow, obstacles, and game logic
 Enhanced with more challenging obstacle behaviors
 """
-GRAVITY = 600
-JUMP_STRENGTH = 400
-GROUND_LEVEL = 150  # Raised ground level to make it more difficult
 
+import math
 import random
 import os
+import time
 from kivy.uix.screenmanager import Screen
 from kivy.uix.widget import Widget
 from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
-from kivy.graphics import Color, Rectangle, Ellipse, Line
+from kivy.graphics import Color, Rectangle, Ellipse, Line, Mesh, PushMatrix, PopMatrix, Translate, Scale
 from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.app import App
-from kivy.vector import Vector
 from kivy.metrics import dp
+from kivy.logger import Logger
 
 from kivy.uix.image import Image
-from kivy.graphics import InstructionGroup, Color, Ellipse
-from kivy.uix.widget import Widget
+
+from utils.game_world import (GameWorld, ObstacleState, CollectibleState, GROUND_LEVEL, COW_START_X,
+                              COW_SIZE, OBSTACLE_TYPES, OBSTACLE_POOL_SIZE, COLLECTIBLE_POOL_SIZE)
+from utils.entity_pool import EntityPool
+from utils.game_loop import FixedStepLoop
+from utils.swarm_store import KITE, BIRD, numpy_available
+from utils.replay import ReplayRecorder
+from utils.frame_profiler import FrameProfiler
+from utils.tracer import traced
+from utils.asset_resolver import resolve_asset
+from utils.texture_cache import texture_cache
 
 class Cow(Widget):
-    def __init__(self, skin_path=None,trail_background=None, **kwargs):
+    """Cow sprite drawn from the world's CowState"""
+
+    def __init__(self, skin_path=None, trail_background=None, **kwargs):
         super().__init__(**kwargs)
-        self.velocity_y = 0
-        self.gravity = GRAVITY
-        self.jump_strength = JUMP_STRENGTH
         self.size_hint = (None, None)
-        self.size = (150,150)
-        self.ground_level = GROUND_LEVEL
-        self.is_falling = False
-        self.fall_reason = None
-        self.game_started = False
-        
-        # Flashing effect properties
-        self.is_flashing = False
-        self.flash_timer = 0
-        self.flash_duration = 1.0
-        self.flash_interval = 0.1
-
-        self.pos = (100, self.ground_level)
+        self.size = COW_SIZE
+        self.pos = (COW_START_X, GROUND_LEVEL)
         self.skin_path = skin_path or "assets/images/characters/bo_0.png"
         self.trail_background = trail_background
 
         # Hiển thị ảnh bò
-        self.image = Image(source=self.skin_path, size=self.size, pos=self.pos)
+        self.image = Image(texture=texture_cache.get(resolve_asset(self.skin_path)), size=self.size, pos=self.pos)
         self.add_widget(self.image)
 
         self.bind(pos=self.update_graphics, size=self.update_graphics)
@@ -56,263 +52,182 @@ class Cow(Widget):
     def update_graphics(self, *args):
         self.image.pos = self.pos
 
-    def update(self, dt):
-        if not self.game_started:
-            return
-
-        # Handle flashing effect
-        if self.is_flashing:
-            self.flash_timer += dt
-            # Toggle visibility every flash_interval
-            flash_cycle = int(self.flash_timer / self.flash_interval)
-            self.image.opacity = 0.3 if flash_cycle % 2 == 0 else 1.0
-            
-            if self.flash_timer >= self.flash_duration:
-                self.is_flashing = False
-                self.flash_timer = 0
-                self.image.opacity = 1.0
-
-        self.velocity_y -= self.gravity * dt
-        self.y += self.velocity_y * dt
-
-        if self.is_falling and self.fall_reason == 'hole' and self.parent.is_cow_in_hole(self):
-            if self.top >= 0:
-                self.x -= 200 * dt
-            if self.top < 0 and self.parent.is_cow_pass_hole(self):
-                if self.parent:
-                    self.parent.lose_life()
-                return
-            else:
-                return
-        else:
-            if self.y <= self.ground_level:
-                self.y = self.ground_level
-                self.velocity_y = 0
-
-    def jump(self):
-        if not self.game_started:
-            self.game_started = True
-
-        if not self.is_falling:
-            self.velocity_y = self.jump_strength
-
-    def start_falling(self, reason='hit'):
-        self.is_falling = True
-        self.fall_reason = reason
-        if reason == 'hole':
-            self.velocity_y = -300
-        
-        # Start flashing effect when hit
-        if reason != 'hole':
-            self.start_flashing()
-
-    def start_flashing(self):
-        """Start the flashing effect"""
-        self.is_flashing = True
-        self.flash_timer = 0
-
-    def reset_to_ground(self):
-        self.x = 100
-        self.y = self.ground_level
-        self.velocity_y = 0
-        self.is_falling = False
-        self.fall_reason = None
-        # Reset flashing effect
-        self.is_flashing = False
-        self.flash_timer = 0
-        self.image.opacity = 1.0
+    def sync(self, state, alpha=1.0):
+        """Copy position and flash opacity from the simulated cow"""
+        self.pos = state.lerp_pos(alpha)
+        self.image.opacity = state.opacity
 
 class Obstacle(Widget):
-    """Enhanced obstacle class with special behaviors"""
+    """Obstacle drawn from a world ObstacleState
 
-    def __init__(self, obstacle_type, **kwargs):
+    The shapes are built once in local coordinates; moving the obstacle only
+    updates its Translate instruction.
+    """
+
+    def __init__(self, state, **kwargs):
         super().__init__(**kwargs)
-        self.obstacle_type = obstacle_type
-        self.speed = 200
+        self.state = state
+        self.obstacle_type = state.obstacle_type
         self.size_hint = (None, None)
-        
-        # Special physics for different obstacles
-        self.velocity_y = 0
-        self.gravity = 0
-        self.rotation_speed = 0
-
-        # Set size and position based on obstacle type
-        if self.obstacle_type == 'electric_wire':
-            self.size = (Window.width, 20)
-            self.pos = (0, Window.height - 20)
-        elif self.obstacle_type == 'hole':
-            self.size = (80, GROUND_LEVEL)
-            self.pos = (Window.width, 0)
-        elif self.obstacle_type == 'barrier':
-
-            self.size = (20, random.randint(80, 140))
-            self.pos = (Window.width, GROUND_LEVEL)
-        elif self.obstacle_type == 'kite':
-            self.size = (30, 40)
-            # Kites start from higher up and to the right, falling diagonally
-            # start_x = Window.width + random.randint(100, 300)  # Further right
-            start_x = Window.width*random.uniform(0.4, 0.7)
-            start_y = Window.height - random.randint(50, 100)   # Random high position
-            self.pos = (start_x, start_y)
-            if start_x <0.6:
-                self.gravity = 700
-            else:
-                self.gravity = 200*random.uniform(0.8, 1)  # Reduced gravity for more controlled fall
-            self.velocity_y = 0
-            self.rotation_speed = random.uniform(180, 360)
-            # Add horizontal drift to fall diagonally
-            self.horizontal_drift = random.uniform(50, 100)  # Leftward drift while falling
-        elif self.obstacle_type == 'bird':
-            self.size = (35, 25)
-            self.pos = (Window.width, random.randint(GROUND_LEVEL + 40, Window.height - 80))
-            self.speed = 2000 # Faster bird speed
-            
-
-        # Store initial position for reference
-        self.initial_y = self.y
-        self.rotation_angle = 0
-            
+        self.size = state.size
+        self.wing_lines = []
+
         self.setup_obstacle()
-        self.bind(pos=self.update_graphics)
+
+    def reset(self, state):
+        """Reuse this pooled widget for a newly spawned obstacle of the same type"""
+        self.state = state
+        if tuple(self.size) != state.size:
+            # Barrier heights and wire widths vary, so rebuild the shapes
+            self.size = state.size
+            self.wing_lines = []
+            self.canvas.clear()
+            self.setup_obstacle()
+        else:
+            self.sync(state)
 
     def setup_obstacle(self):
         """Setup obstacle based on type using RELATIVE coordinates."""
+        width, height = self.size
         with self.canvas:
+            PushMatrix()
+            self.translate = Translate(*self.state.pos)
+
             if self.obstacle_type == 'electric_wire':
                 Color(1, 1, 0, 1)  # Yellow
-                Line(points=[self.x, self.center_y, self.right, self.center_y], width=3)
-                Line(points=[self.x, self.y, self.x, self.top], width=2)
-                Line(points=[self.right, self.y, self.right, self.top], width=2)
+                Line(points=[0, height / 2, width, height / 2], width=3)
+                Line(points=[0, 0, 0, height], width=2)
+                Line(points=[width, 0, width, height], width=2)
 
             elif self.obstacle_type == 'hole':
                 Color(0, 0, 0, 1)  # Black hole
-                Rectangle(pos=self.pos, size=self.size)
+                Rectangle(pos=(0, 0), size=self.size)
                 Color(0.3, 0.2, 0.1, 1)
-                Line(points=[self.x, self.top, self.right, self.top], width=4)
+                Line(points=[0, height, width, height], width=4)
 
             elif self.obstacle_type == 'kite':
-                # Kite with rotation effect
                 Color(1, 0.5, 0, 1)
                 points = [
-                    self.center_x, self.top,
-                    self.right, self.center_y,
-                    self.center_x, self.y,
-                    self.x, self.center_y
+                    width / 2, height,
+                    width, height / 2,
+                    width / 2, 0,
+                    0, height / 2
                 ]
                 Line(points=points + points[:2], width=2)
                 Color(1, 0, 0, 1)
-                # Dynamic tail that moves with the kite
+                # Tail shape is picked once per kite
                 tail_points = []
                 for i in range(5):
                     offset_x = random.randint(-8, 8)
                     offset_y = i * 12
-                    tail_points.extend([self.center_x + offset_x, self.y - offset_y])
+                    tail_points.extend([width / 2 + offset_x, -offset_y])
                 Line(points=tail_points, width=2)
 
             elif self.obstacle_type == 'barrier':
                 Color(0.5, 0.3, 0.1, 1)
-                Rectangle(pos=self.pos, size=self.size)
+                Rectangle(pos=(0, 0), size=self.size)
                 Color(0.3, 0.2, 0.05, 1)
-                for i in range(0, int(self.height), 15):
-                    Line(points=[self.x, self.y + i, self.right, self.y + i], width=1)
+                for i in range(0, int(height), 15):
+                    Line(points=[0, i, width, i], width=1)
 
             elif self.obstacle_type == 'bird':
                 # Enhanced bird with flapping effect
                 Color(0.4, 0.4, 0.4, 1)
-                Ellipse(pos=self.pos, size=self.size)
+                Ellipse(pos=(0, 0), size=self.size)
                 Color(0.2, 0.2, 0.2, 1)
-                # Animated wing positions
-                wing_offset = 8 + 4 * abs(self.rotation_angle % 60 - 30) / 30
-                Line(points=[self.x + 5, self.center_y, self.x + 15, self.center_y + wing_offset], width=2)
-                Line(points=[self.x + 20, self.center_y, self.right - 5, self.center_y + wing_offset], width=2)
+                self.wing_lines = [Line(width=2), Line(width=2)]
+                self.update_wings()
 
-    def update_graphics(self, *args):
-        self.canvas.clear()
-        self.setup_obstacle()
+            PopMatrix()
+
+    def update_wings(self):
+        """Move the bird's wing tips for the flapping animation"""
+        width, height = self.size
+        wing_offset = 8 + 4 * abs(self.state.rotation_angle % 60 - 30) / 30
+        left_wing, right_wing = self.wing_lines
+        left_wing.points = [5, height / 2, 15, height / 2 + wing_offset]
+        right_wing.points = [20, height / 2, width - 5, height / 2 + wing_offset]
+
+    def sync(self, state, alpha=1.0):
+        """Move the obstacle graphics to the simulated position"""
+        self.translate.xy = state.lerp_pos(alpha)
+        if self.wing_lines:
+            self.update_wings()
 
-    def update(self, dt, speed_multiplier=1.0):
-        if self.obstacle_type == 'electric_wire':
-            return False
-        
-        # Horizontal movement for all obstacles
-        self.x -= self.speed * speed_multiplier * dt
-        
-        # Special behavior for kites - falling diagonally
-        if self.obstacle_type == 'kite':
-            self.velocity_y -= self.gravity * dt
-            self.velocity_y = max(self.velocity_y, -100)  # limit fall speed
-            self.y += self.velocity_y * dt
-            self.rotation_angle += self.rotation_speed * dt
-            self.x -= self.horizontal_drift * dt  # trôi ngang
-
-            
-            # If kite hits the ground, it bounces slightly
-            # if self.y <= GROUND_LEVEL:
-            #     self.y = GROUND_LEVEL
-            #     self.velocity_y = abs(self.velocity_y) * 0.3  # Small bounce
-        
-        # Special behavior for birds - slight vertical bobbing
-        elif self.obstacle_type == 'bird':
-            # Birds bob up and down slightly as they fly
-            bob_amplitude = 20
-            bob_frequency = 5
-            time_factor = (Window.width - self.x) * 0.01  # Use position as time
-            # self.y = self.initial_y + bob_amplitude * (0.5 + 0.5 * __import__('math').sin(time_factor * bob_frequency))
-            self.rotation_angle += 120 * dt  # Wing flapping animation
-        
-        return self.x < -self.width
-     
 class Collectible(Widget):
-    """Enhanced collectible grass item"""
+    """Collectible grass drawn from a world CollectibleState
 
-    def __init__(self, **kwargs):
+    The grass is built once around its center; the pulse only changes the
+    Scale instruction and moving only changes the Translate.
+    """
+
+    def __init__(self, state, **kwargs):
         super().__init__(**kwargs)
-        self.speed = 200
-        self.size = (25, 25)
-        self.pos = (Window.width, random.randint(GROUND_LEVEL + 30, Window.height - 80))
+        self.state = state
         self.size_hint = (None, None)
-        self.pulse_timer = 0
-        self.bind(pos=self.update_graphics)
-        self.update_graphics()
+        self.size = state.size
+        self.setup_graphics()
 
-    def update_graphics(self, *args):
-        self.canvas.clear()
+    def reset(self, state):
+        """Reuse this pooled widget for a newly spawned collectible"""
+        self.state = state
+        self.sync(state)
+
+    def setup_graphics(self):
+        half_w, half_h = self.width / 2, self.height / 2
         with self.canvas:
-            # Pulsing effect for collectibles
-            pulse_scale = 1.0 + 0.2 * abs(__import__('math').sin(self.pulse_timer * 4))
-            scaled_size = (self.size[0] * pulse_scale, self.size[1] * pulse_scale)
-            offset = ((self.size[0] - scaled_size[0]) / 2, (self.size[1] - scaled_size[1]) / 2)
-            
+            PushMatrix()
+            self.translate = Translate(self.state.x + half_w, self.state.y + half_h)
+            self.scale = Scale(1, 1, 1)
+
             Color(0, 0.8, 0, 1)
-            Ellipse(pos=(self.pos[0] + offset[0], self.pos[1] + offset[1]), size=scaled_size)
+            Ellipse(pos=(-half_w, -half_h), size=self.size)
             Color(0, 0.6, 0, 1)
-            small_size = (8 * pulse_scale, 8 * pulse_scale)
-            Ellipse(pos=(self.x + 4, self.center_y + 4), size=small_size)
-            Ellipse(pos=(self.center_x + 4, self.y + 4), size=small_size)
-            Ellipse(pos=(self.center_x - 4, self.center_y + 4), size=small_size)
-            Ellipse(pos=(self.x + 4, self.center_y - 4), size=small_size)
-
-    def update(self, dt, speed_multiplier=1.0):
-        self.pulse_timer += dt
-        self.x -= self.speed * speed_multiplier * dt
-        self.update_graphics()  # Update pulsing animation
-        return self.x < -self.width
+            small_size = (8, 8)
+            Ellipse(pos=(4 - half_w, 4), size=small_size)
+            Ellipse(pos=(4, 4 - half_h), size=small_size)
+            Ellipse(pos=(-4, 4), size=small_size)
+            Ellipse(pos=(4 - half_w, -4), size=small_size)
+
+            PopMatrix()
+
+    def sync(self, state, alpha=1.0):
+        """Move and pulse the grass from the simulated collectible"""
+        x, y = state.lerp_pos(alpha)
+        self.translate.xy = (x + self.width / 2, y + self.height / 2)
+        # Pulsing effect for collectibles
+        pulse_scale = 1.0 + 0.2 * abs(math.sin(state.pulse_timer * 4))
+        self.scale.xyz = (pulse_scale, pulse_scale, 1)
 
 class GameScreen(Screen):
     """Main game screen with enhanced difficulty"""
-    
+
+    # Simulation ticks per second, independent of the display refresh rate
+    SIM_TICK_RATE = 60
+    # Most simulation ticks run in one frame before time is dropped
+    MAX_CATCH_UP_STEPS = 5
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.game_running = False
-        self.score = 0
-        self.lives = 3
-        self.speed_multiplier = 1.0
-        self.obstacles = []
-        self.collectibles = []
-        self.spawn_timer = 0
-        self.collectible_spawn_timer = 0
+        self.world = GameWorld(Window.width, Window.height)
+        self.loop = FixedStepLoop(self.world, self.SIM_TICK_RATE, self.MAX_CATCH_UP_STEPS)
+        self.obstacle_widgets = {}
+        self.collectible_widgets = {}
+        self.obstacle_widget_pool = EntityPool(Obstacle)
+        self.collectible_widget_pool = EntityPool(Collectible)
+        self.frame_profiler = None
+        self.profiler_overlay = None
         self.build_ui()
-    
+
+    @property
+    def score(self):
+        return self.world.score
+
+    @property
+    def lives(self):
+        return self.world.lives
+
     def build_ui(self):
         """Build the game UI"""
         # Background
@@ -322,15 +237,21 @@ class GameScreen(Screen):
             # nền đất - higher ground
             ground_height = Window.height * 5 / 7  # Higher ground ratio
             self.ground_rect = Rectangle(
-                source="assets/images/ground/ground_1.png",
+                texture=texture_cache.get(resolve_asset("assets/images/ground/ground_1.png")),
                 size=(Window.width, ground_height),
                 pos=(0, 0)
             )
+            # Swarm mode kites and birds, one mesh per type behind the cow
+            Color(1, 0.5, 0, 1)
+            self.swarm_kite_mesh = Mesh(mode='triangles')
+            Color(0.4, 0.4, 0.4, 1)
+            self.swarm_bird_mesh = Mesh(mode='triangles')
+            Color(1, 1, 1, 1)
 
         # Bind to update background
         self.bind(size=self.update_bg)
         Window.bind(size=self.update_bg)
-        
+
         # UI Layout
         ui_layout = BoxLayout(
             orientation='horizontal',
@@ -339,7 +260,7 @@ class GameScreen(Screen):
             padding=[dp(20), dp(10)],
             spacing=dp(10)
         )
-        
+
         # Lives display
         self.lives_label = Label(
             text='live live live',
@@ -347,7 +268,7 @@ class GameScreen(Screen):
             size_hint=(0.3, 1),
             halign='left'
         )
-        
+
         # Score display
         self.score_label = Label(
             text='Score: 0',
@@ -357,9 +278,9 @@ class GameScreen(Screen):
         )
         ui_layout.add_widget(self.lives_label)
         ui_layout.add_widget(self.score_label)
-        
+
         self.add_widget(ui_layout)
-        
+
         # Create cow
         self.cow = Cow()
         self.add_widget(self.cow)
@@ -372,24 +293,26 @@ class GameScreen(Screen):
         ground_height = Window.height * 5 / 7
         self.ground_rect.size = (Window.width, ground_height)
         self.ground_rect.pos = (0, 0)
-    
+
+        # The replay records the size a run started with, so a run in
+        # progress keeps it; start_game() resets the world to the new size
+        if not self.game_running:
+            self.world.resize(Window.width, Window.height)
+
     def on_enter(self):
         """Called when entering the game screen"""
         self.start_game()
         App.get_running_app().sound_manager.play_background_music()
-    
+
     def on_leave(self):
         """Called when leaving the game screen"""
         self.stop_game()
-    
+
+    @traced('GameScreen.start_game')
     def start_game(self):
         """Start the game"""
         self.game_running = True
-        self.score = 0
-        self.lives = 3
-        self.speed_multiplier = 1.0
-        self.spawn_timer = 0
-        self.collectible_spawn_timer = 0
+        self.loop.restart()
 
         # Get skin and background
         app = App.get_running_app()
@@ -404,103 +327,126 @@ class GameScreen(Screen):
         bg_path = f"assets/images/backgrounds/{background_id}.png" if background_id else "assets/images/backgrounds/background_menu.png"
 
         # Create new Cow with skin/background
+        texture_cache.pin('skin', resolve_asset(skin_path))
         if hasattr(self, 'cow'):
             self.remove_widget(self.cow)
 
         self.cow = Cow(skin_path=skin_path, trail_background=background_id)
-        self.cow.pos = (100, GROUND_LEVEL)
-        self.cow.game_started = False
         self.add_widget(self.cow)
         print("Added cow with skin:", self.cow.skin_path)
 
         if bg_path and os.path.exists(bg_path):
-            self.bg_rect.source = bg_path
+            self.bg_rect.texture = texture_cache.pin('background', resolve_asset(bg_path))
 
         # Clear old obstacles and collectibles
-        for obstacle in self.obstacles:
-            self.remove_widget(obstacle)
-        for collectible in self.collectibles:
-            self.remove_widget(collectible)
-        self.obstacles.clear()
-        self.collectibles.clear()
-
-        self.spawn_obstacle('electric_wire')  # Start with electric wire
+        for widget in self.obstacle_widgets.values():
+            self.remove_widget(widget)
+            self.obstacle_widget_pool.release(widget.obstacle_type, widget)
+        for widget in self.collectible_widgets.values():
+            self.remove_widget(widget)
+            self.collectible_widget_pool.release('grass', widget)
+        self.obstacle_widgets.clear()
+        self.collectible_widgets.clear()
+        self.preallocate_widgets()
+
+        self.setup_swarm(app.data_manager.get_setting('swarm_mode', False))
+        self.world.reset(Window.width, Window.height)
+        self.world.spawn_obstacle('electric_wire')  # Start with electric wire
+        self.recorder = ReplayRecorder(self.world, self.SIM_TICK_RATE)
+        self.loop.recorder = self.recorder
+        self.handle_events(self.world.events)
+        self.render_world()
 
         # UI
         self.update_ui()
+        if app.data_manager.get_setting('profiler_overlay', False) and self.world.profiler is None:
+            self.toggle_profiler()
 
-        # Game loop
-        Clock.schedule_interval(self.update_game, 1.0 / 60.0)
+        # Game loop: render every frame, simulate in fixed ticks
+        Clock.schedule_interval(self.update_game, 0)
 
     def stop_game(self):
         """Stop the game"""
         self.game_running = False
         Clock.unschedule(self.update_game)
-    
+
     def pause_game(self):
         """Pause the game"""
         if self.game_running:
             Clock.unschedule(self.update_game)
             self.game_running = False
-    
+
+    @traced('update_game')
     def update_game(self, dt):
         """Main game update loop"""
         if not self.game_running:
             return
-        
-        # Update cow
-        self.cow.update(dt)
-        
-        # Only spawn obstacles and update game elements after cow starts moving
-        if not self.cow.game_started:
-            return
-        
-        # Update speed based on score
-        self.speed_multiplier = 1.0 + (self.score // 30) * 0.3  # Faster difficulty increase
-        
-        # Spawn obstacles more frequently
-        self.spawn_timer += dt
-        spawn_interval = 3.5 / self.speed_multiplier  # More frequent spawning
-        if self.spawn_timer >= spawn_interval:
-            self.spawn_obstacle()
-            self.spawn_timer = 0
-        
-        # Spawn collectibles more frequently
-        self.collectible_spawn_timer += dt
-        collectible_interval = 2.0  # More frequent collectibles
-        if self.collectible_spawn_timer >= collectible_interval:
-            # Sometimes spawn multiple collectibles
-            num_collectibles = random.choices([1, 2, 3], weights=[60, 30, 10])[0]
-            for _ in range(num_collectibles):
-                self.spawn_collectible()
-            self.collectible_spawn_timer = 0
-        
-        # Update obstacles
-        for obstacle in self.obstacles[:]:
-            if obstacle.update(dt, self.speed_multiplier):
-                self.remove_widget(obstacle)
-                self.obstacles.remove(obstacle)
-            else:
-                self.check_collision(obstacle)
-        
-        # Update collectibles
-        for collectible in self.collectibles[:]:
-            if collectible.update(dt, self.speed_multiplier):
-                self.remove_widget(collectible)
-                self.collectibles.remove(collectible)
-            else:
-                self.check_collectible_collision(collectible)
-    
-    def spawn_obstacle(self, obstacle_type=None):
-        """Spawn a random obstacle"""
-        if obstacle_type is None:
-            # Increased probability of challenging obstacles
-            obstacle_types = ['hole', 'kite', 'kite', 'kite', 'barrier',  'bird', 'electric_wire']
-            obstacle_type = random.choice(obstacle_types)
-        
-        obstacle = Obstacle(obstacle_type=obstacle_type)
-        
-        self.obstacles.append(obstacle)
+
+        profiler = self.world.profiler
+        if profiler is not None:
+            profiler.begin_frame(dt)
+
+        events = self.loop.advance(dt)
+        self.handle_events(events)
+        if self.game_running:
+            self.render_world(self.loop.alpha)
+
+        if profiler is not None:
+            profiler.mark('ui')
+            profiler.end_frame(self.world.entity_counts())
+
+    def handle_events(self, events):
+        """Apply world events to widgets, sounds and UI"""
+        app = App.get_running_app()
+        sound_manager = getattr(app, 'sound_manager', None) if app else None
+
+        for kind, payload in events:
+            if kind == 'spawn_obstacle':
+                self.add_obstacle_widget(payload)
+            elif kind == 'spawn_collectible':
+                self.add_collectible_widget(payload)
+            elif kind == 'despawn_obstacle':
+                widget = self.obstacle_widgets.pop(payload)
+                self.remove_widget(widget)
+                self.obstacle_widget_pool.release(widget.obstacle_type, widget)
+            elif kind == 'despawn_collectible':
+                widget = self.collectible_widgets.pop(payload)
+                self.remove_widget(widget)
+                self.collectible_widget_pool.release('grass', widget)
+            elif kind == 'hit':
+                if sound_manager:
+                    sound_manager.play_sound('hit')
+            elif kind == 'collect':
+                if sound_manager:
+                    sound_manager.play_sound('collect')
+                self.update_ui()
+            elif kind == 'life_lost':
+                self.update_ui()
+            elif kind == 'game_over':
+                if payload == 'electric_wire' and sound_manager:
+                    sound_manager.play_sound('game_over')
+                self.game_over()
+                return
+
+    def preallocate_widgets(self):
+        """Fill the widget pools so spawning mid-run does not construct widgets"""
+        for obstacle_type in sorted(set(OBSTACLE_TYPES)):
+            template = ObstacleState(obstacle_type, Window.width, Window.height)
+            self.obstacle_widget_pool.preallocate(obstacle_type, OBSTACLE_POOL_SIZE, template)
+        template = CollectibleState(Window.width, Window.height)
+        self.collectible_widget_pool.preallocate('grass', COLLECTIBLE_POOL_SIZE, template)
+
+    def pool_stats(self):
+        """Hit/miss statistics of the world and widget pools"""
+        stats = self.world.pool_stats()
+        stats['obstacle_widgets'] = self.obstacle_widget_pool.stats()
+        stats['collectible_widgets'] = self.collectible_widget_pool.stats()
+        return stats
+
+    def add_obstacle_widget(self, state):
+        """Show a pooled widget for a spawned obstacle"""
+        obstacle = self.obstacle_widget_pool.acquire(state.obstacle_type, state)
+        self.obstacle_widgets[state] = obstacle
         try:
             cow_index = self.children.index(self.cow)
             if obstacle.obstacle_type == 'hole':
@@ -508,139 +454,125 @@ class GameScreen(Screen):
             else:
                 self.add_widget(obstacle, index=cow_index)
         except ValueError:
-            self.add_widget(obstacle)    
-    
-    def spawn_collectible(self):
-        """Spawn a collectible grass"""
-        collectible = Collectible()
-        self.collectibles.append(collectible)
+            self.add_widget(obstacle)
+
+    def add_collectible_widget(self, state):
+        """Show a pooled widget for a spawned collectible"""
+        collectible = self.collectible_widget_pool.acquire('grass', state)
+        self.collectible_widgets[state] = collectible
         try:
             cow_index = self.children.index(self.cow)
             self.add_widget(collectible, index=cow_index + 1)
         except ValueError:
-            self.add_widget(collectible)    
-    
-    def check_collision(self, obstacle):
-        """Check collision between cow and obstacle"""
-        if self.cow.collide_widget(obstacle):
-            print('o no, cow hit an obstacle!')
-            self.cow.start_falling(obstacle.obstacle_type)
-            app = App.get_running_app()
-            
-            if obstacle.obstacle_type == 'electric_wire':
-                # Instant game over for electric wire
-                if app and hasattr(app, 'sound_manager'):
-                    app.sound_manager.play_sound('game_over')
-                self.game_over()
-                return
-            
-            elif obstacle.obstacle_type == 'hole':
-                # Don't handle hole collision here
-                pass
-            
-            else:
-                # Other obstacles cause cow to fall and lose life
-                if app and hasattr(app, 'sound_manager'):
-                    app.sound_manager.play_sound('hit')
-                
-                self.cow.start_falling('hit')
-                
-                # Remove obstacle
-                self.remove_widget(obstacle)
-                self.obstacles.remove(obstacle)
-                
-                # Lose life after a short delay
-                Clock.schedule_once(lambda dt: self.lose_life(), 0.5)
-    
-    def lose_life(self):
-        """Lose a life"""
-        self.lives -= 1
-        self.update_ui()
-        
-        # Reset cow to ground
-        self.cow.reset_to_ground()
-        self.cow.pos = (100, self.cow.ground_level)
-        
-        if self.lives <= 0:
-            self.game_over()
-    
-    def is_cow_in_hole(self, cow):
-        """Check if cow is positioned over a hole"""
-        for obstacle in self.obstacles:
-            if obstacle.obstacle_type == 'hole':
-                hole_left = obstacle.x
-                hole_right = obstacle.right
-                cow_center = cow.center_x
-                
-                if cow_center >= (hole_left + hole_right) / 2:
-                    return True
-        return False
-    
-    def is_cow_pass_hole(self, cow):
-        """Check if cow is positioned over a hole"""
-        for obstacle in self.obstacles:
-            if obstacle.obstacle_type == 'hole':
-                hole_left = obstacle.x
-                hole_right = obstacle.right
-                
-                if hole_right <= 100 * 0.8:
-                    return True
-        return False
-
-    def check_collectible_collision(self, collectible):
-        """Check collision between cow and collectible"""
-        if self.cow.collide_widget(collectible):
-            app = App.get_running_app()
-            if app and hasattr(app, 'sound_manager'):
-                app.sound_manager.play_sound('collect')
-            
-            self.score += 1
-            self.update_ui()
-            self.remove_widget(collectible)
-            self.collectibles.remove(collectible)
-    
+            self.add_widget(collectible)
+
+    def setup_swarm(self, enabled):
+        """Turn the swarm stress mode on or off for the next run"""
+        if enabled and not numpy_available():
+            Logger.warning("GameScreen: Swarm mode needs numpy, playing without it")
+            enabled = False
+        self.world.set_swarm(enabled)
+        if not enabled:
+            self.swarm_kite_mesh.vertices = []
+            self.swarm_kite_mesh.indices = []
+            self.swarm_bird_mesh.vertices = []
+            self.swarm_bird_mesh.indices = []
+
+    def render_world(self, alpha=1.0):
+        """Move widgets to the world state, alpha of the way into the next tick"""
+        self.cow.sync(self.world.cow, alpha)
+        for state, widget in self.obstacle_widgets.items():
+            widget.sync(state, alpha)
+        for state, widget in self.collectible_widgets.items():
+            widget.sync(state, alpha)
+        if self.world.swarm is not None:
+            self.render_swarm(alpha)
+
+    def render_swarm(self, alpha):
+        """Upload the swarm as two meshes instead of one widget per entity"""
+        for kind, mesh in ((KITE, self.swarm_kite_mesh), (BIRD, self.swarm_bird_mesh)):
+            vertices, indices = self.world.swarm.quads(kind, alpha)
+            mesh.vertices = vertices.tolist()
+            mesh.indices = indices.tolist()
+
+    @traced('GameScreen.game_over')
     def game_over(self):
         """Handle game over"""
         self.stop_game()
-        
+
         # Save score data
         app = App.get_running_app()
         if app and hasattr(app, 'data_manager'):
-            app.data_manager.add_points(self.score)
+            self.save_replay(app.data_manager)
             is_new_high_score = self.score > app.data_manager.get_best_score()
-            app.data_manager.set_best_score(self.score)
-            
+            app.data_manager.record_run(self.score, self.score)
+
             # Pass data to game over screen
             game_over_screen = self.manager.get_screen('game_over')
             game_over_screen.set_score_data(self.score, is_new_high_score)
-        
+
         self.manager.current = 'game_over'
-    
+
+    def toggle_profiler(self):
+        """Show or hide the frame profiler HUD; profiling only runs while shown"""
+        if self.world.profiler is None:
+            if self.profiler_overlay is None:
+                from screens.profiler_overlay import ProfilerOverlay
+                self.frame_profiler = FrameProfiler()
+                self.profiler_overlay = ProfilerOverlay(self.frame_profiler)
+            self.world.profiler = self.frame_profiler
+            self.add_widget(self.profiler_overlay)
+            self.profiler_overlay.start()
+        else:
+            self.world.profiler = None
+            self.profiler_overlay.stop()
+            self.remove_widget(self.profiler_overlay)
+
+    def dump_profile(self):
+        """Write the profiler's recent frames to a file next to the save data"""
+        if self.frame_profiler is None:
+            return None
+        app = App.get_running_app()
+        path = app.data_manager.data_dir('profiles', time.strftime('frames_%Y%m%d_%H%M%S.json'))
+        try:
+            self.frame_profiler.dump(path)
+            Logger.info(f"GameScreen: Frame profile written to {path}")
+        except OSError as e:
+            Logger.warning(f"GameScreen: Could not write frame profile: {e}")
+            return None
+        return path
+
+    def save_replay(self, data_manager):
+        """Keep the inputs of the last run so it can be reproduced"""
+        self.recorder.finish(self.world, self.loop.tick)
+        replay_path = data_manager.data_dir('replays', 'last_run.json')
+        try:
+            self.recorder.save(replay_path)
+        except OSError as e:
+            Logger.warning(f"GameScreen: Could not save replay: {e}")
+
     def update_ui(self):
         """Update UI elements"""
         # Update lives display
         heart_text = 'L ' * self.lives + 'D ' * (3 - self.lives)
         self.lives_label.text = heart_text.strip()
-        
+
         # Update score
         self.score_label.text = f'Score: {self.score}'
-    
-    def on_touch_down(self, touch):
-        """Handle touch input"""
+
+    def fly(self):
+        """Queue a jump for the next world step"""
         if self.game_running:
-            self.cow.jump()
+            self.loop.push_input('jump')
             app = App.get_running_app()
             if app and hasattr(app, 'sound_manager'):
                 app.sound_manager.play_sound('fly')
+
+    def on_touch_down(self, touch):
+        """Handle touch input"""
+        self.fly()
         return True
-    
+
     def on_space_press(self):
         """Handle space bar press"""
-        if self.game_running:
-            self.cow.jump()
-            app = App.get_running_app()
-            if app and hasattr(app, 'sound_manager'):
-                app.sound_manager.play_sound('fly')
-
-import os
-print("Files in characters folder:", os.listdir("assets/images/characters"))
\ No newline at end of file
+        self.fly()
@@ -0,0 +1,85 @@
+"""
+Lazy Screen Manager for When Cows Fly
+ScreenManager that builds each registered screen the first time it is
+needed, can build screens ahead during idle frames, and can drop rarely
+used screens once they have been left.
+
+Screens registered by dotted class path ('screens.shop_screen.ShopScreen')
+are not even imported until then, so their widget modules stay unloaded.
+"""
+
+import importlib
+
+from kivy.uix.screenmanager import ScreenManager
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+from utils.tracer import tracer
+
+class LazyScreenManager(ScreenManager):
+    """Creates screens from registered factories on first use"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Screen name -> factory(name=...) returning the Screen, or its dotted class path
+        self.factories = {}
+        self.release_on_leave = set()
+        self.prewarm_queue = []
+
+    def register(self, name, factory, release_on_leave=False):
+        """Add a screen to build on first use; release_on_leave frees it after it is left"""
+        self.factories[name] = factory
+        if release_on_leave:
+            self.release_on_leave.add(name)
+
+    def get_screen(self, name):
+        for screen in self.screens:
+            if screen.name == name:
+                return screen
+        if name not in self.factories:
+            return super().get_screen(name)
+        return self.build_screen(name)
+
+    def has_screen(self, name):
+        return name in self.factories or super().has_screen(name)
+
+    def build_screen(self, name):
+        factory = self.factories[name]
+        if isinstance(factory, str):
+            with tracer.span(f'import {factory}', 'screen'):
+                module_name, class_name = factory.rsplit('.', 1)
+                factory = self.factories[name] = getattr(importlib.import_module(module_name), class_name)
+        with tracer.span(f'build {name}', 'screen'):
+            screen = factory(name=name)
+        if name in self.release_on_leave:
+            screen.bind(on_leave=self.on_release_screen_leave)
+        self.add_widget(screen)
+        Logger.info(f"LazyScreenManager: Built screen '{name}'")
+        return screen
+
+    def is_built(self, name):
+        return any(screen.name == name for screen in self.screens)
+
+    def prewarm(self, names):
+        """Build the given screens ahead of time, one per idle frame"""
+        self.prewarm_queue.extend(names)
+        Clock.schedule_once(self.prewarm_next)
+
+    def prewarm_next(self, *args):
+        while self.prewarm_queue:
+            name = self.prewarm_queue.pop(0)
+            if not self.is_built(name):
+                self.build_screen(name)
+                break
+        if self.prewarm_queue:
+            Clock.schedule_once(self.prewarm_next)
+
+    def on_release_screen_leave(self, screen):
+        # Removing a screen inside its own on_leave dispatch would upset the transition
+        Clock.schedule_once(lambda dt: self.release_screen(screen))
+
+    def release_screen(self, screen):
+        if screen.manager is not self or screen is self.current_screen:
+            return
+        self.remove_widget(screen)
+        Logger.info(f"LazyScreenManager: Released screen '{screen.name}'")
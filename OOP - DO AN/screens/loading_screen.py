@@ -0,0 +1,47 @@
+"""
+Loading Screen for When Cows Fly
+"""
+
+from kivy.uix.screenmanager import Screen
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Rectangle
+
+class LoadingScreen(Screen):
+    """Progress screen shown while the Preloader runs"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.build_ui()
+
+    def build_ui(self):
+        """Build the loading UI"""
+        with self.canvas.before:
+            Color(0.1, 0.3, 0.6, 1)  # Dark blue background
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
+        self.bind(size=self.update_bg, pos=self.update_bg)
+
+        layout = BoxLayout(orientation='vertical', padding=40, spacing=10)
+        layout.add_widget(Widget(size_hint=(1, 0.4)))
+        layout.add_widget(Label(
+            text='[size=36][color=ffffff]When Cows Fly[/color][/size]',
+            markup=True,
+            size_hint=(1, 0.15)
+        ))
+        self.progress_bar = ProgressBar(max=1, value=0, size_hint=(1, 0.05))
+        layout.add_widget(self.progress_bar)
+        self.status_label = Label(text='Loading...', size_hint=(1, 0.05))
+        layout.add_widget(self.status_label)
+        layout.add_widget(Widget(size_hint=(1, 0.35)))
+        self.add_widget(layout)
+
+    def update_bg(self, *args):
+        self.bg_rect.size = self.size
+        self.bg_rect.pos = self.pos
+
+    def set_progress(self, done, total, name):
+        self.progress_bar.max = max(total, 1)
+        self.progress_bar.value = done
+        self.status_label.text = f'Loading {name}... {done}/{total}'
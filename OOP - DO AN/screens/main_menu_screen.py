@@ -12,6 +12,8 @@ from kivy.core.window import Window
 from kivy.uix.image import Image
 from screens.hover_button import HoverButton  # Đảm bảo có file hover_button.py
 from kivy.uix.behaviors import ButtonBehavior
+from utils.asset_resolver import resolve_asset
+from utils.texture_cache import texture_cache
 
 class ImageButton(ButtonBehavior, Image):
     pass
@@ -29,7 +31,7 @@ class MainMenuScreen(Screen):
     def build_ui(self):
          # 1. Background
         self.bg_image = Image(
-            source='assets/images/backgrounds/background_1.png',
+            # Texture set in update_preview(), after the preloader has loaded it
             allow_stretch=True,
             keep_ratio=False,
             size_hint=(None, None),
@@ -104,7 +106,7 @@ class MainMenuScreen(Screen):
 
         # 10. Settings icon
         settings_btn = ImageButton(
-            source='assets/images/icons/settings_icon.png',
+            source=resolve_asset('assets/images/icons/settings_icon.png'),
             size_hint=(None, None),
             size=(80, 80),
             pos_hint={'right': 0.98, 'y': 0.02}
@@ -259,15 +261,16 @@ class MainMenuScreen(Screen):
         skin_path = f"assets/images/characters/{skin_id}.png" if skin_id else "assets/images/characters/bo_0.png"
         bg_path = f"assets/images/backgrounds/{bg_id}.png" if bg_id else "assets/images/backgrounds/background_1.png"
 
+        # The equipped skin and background stay loaded; others may be evicted
         if os.path.exists(skin_path):
-            self.cow_preview.source = skin_path
+            self.cow_preview.texture = texture_cache.pin('skin', resolve_asset(skin_path))
         else:
-            self.cow_preview.source = "assets/images/characters/bo_0.png"
+            self.cow_preview.texture = texture_cache.pin('skin', resolve_asset("assets/images/characters/bo_0.png"))
           
         if os.path.exists(bg_path):
-            self.bg_image.source = bg_path
+            self.bg_image.texture = texture_cache.pin('background', resolve_asset(bg_path))
         else:
-            self.bg_image.source = "assets/images/backgrounds/background_1.png"
+            self.bg_image.texture = texture_cache.pin('background', resolve_asset("assets/images/backgrounds/background_1.png"))
 
     
     # def on_pre_enter(self):
@@ -0,0 +1,75 @@
+"""
+Profiler Overlay for When Cows Fly
+HUD with FPS, frame-time histogram, p99 and per-phase timings
+"""
+
+from kivy.uix.label import Label
+from kivy.graphics import Color, Rectangle
+from kivy.clock import Clock
+from kivy.metrics import dp
+
+from utils.frame_profiler import HISTOGRAM_EDGES_MS
+from utils.texture_cache import texture_cache
+
+# The text is re-laid out a few times per second, not every frame
+REFRESH_INTERVAL = 0.25
+HISTOGRAM_BAR_WIDTH = 20
+
+
+class ProfilerOverlay(Label):
+    """Text HUD over the game screen, fed by a FrameProfiler"""
+
+    def __init__(self, profiler, **kwargs):
+        super().__init__(**kwargs)
+        self.profiler = profiler
+        self.size_hint = (None, None)
+        self.size = (dp(240), dp(280))
+        self.pos_hint = {'x': 0.02, 'top': 0.88}
+        self.font_size = '11sp'
+        self.halign = 'left'
+        self.valign = 'top'
+        self.text_size = self.size
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self.bg_rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self.update_bg, size=self.update_bg)
+
+    def update_bg(self, *args):
+        self.bg_rect.pos = self.pos
+        self.bg_rect.size = self.size
+
+    def start(self):
+        Clock.schedule_interval(self.refresh, REFRESH_INTERVAL)
+
+    def stop(self):
+        Clock.unschedule(self.refresh)
+
+    def refresh(self, *args):
+        stats = self.profiler.stats()
+        if not stats:
+            self.text = 'Profiling...'
+            return
+
+        lines = [
+            f"FPS {stats['fps']:.0f}  frame {stats['mean_ms']:.1f} ms",
+            f"p50 {stats['p50_ms']:.1f}  p99 {stats['p99_ms']:.1f}  max {stats['max_ms']:.1f} ms",
+            f"last {stats['frames']} frames:",
+        ]
+        labels = [f"<={edge}" for edge in HISTOGRAM_EDGES_MS] + [f">{HISTOGRAM_EDGES_MS[-1]}"]
+        most = max(stats['histogram']) or 1
+        for label, count in zip(labels, stats['histogram']):
+            bar = '#' * round(count * HISTOGRAM_BAR_WIDTH / most)
+            lines.append(f"{label:>5} ms {bar} {count}")
+
+        lines.append('phases (ms/frame):')
+        for phase, ms in stats['phases_ms'].items():
+            lines.append(f"  {phase:<12} {ms:.3f}")
+
+        counts = '  '.join(f"{name} {count}" for name, count in stats['counts'].items())
+        lines.append(counts)
+
+        textures = texture_cache.stats()
+        lines.append(f"textures {textures['textures']}  {textures['resident_bytes'] / 2 ** 20:.1f}"
+                     f"/{textures['budget_bytes'] / 2 ** 20:.0f} MB  hit {textures['hit_rate']:.0%}")
+        self.text = '\n'.join(lines)
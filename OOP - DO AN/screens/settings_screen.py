@@ -163,10 +163,7 @@ class SettingsScreen(Screen):
         instance.text = 'Music: ON' if is_on else 'Music: OFF'
         app.data_manager.set_music_enabled(is_on)
         if hasattr(app, 'sound_manager'):
-            if is_on:
-                app.sound_manager.play_background_music()
-            else:
-                app.sound_manager.stop_background_music() 
+            app.sound_manager.set_music_enabled(is_on)
 
     def update_bg(self, *args):
         """Update background size"""
@@ -195,10 +192,12 @@ class SettingsScreen(Screen):
         app = App.get_running_app()
         if app and hasattr(app, 'data_manager'):
             app.data_manager.set_sound_enabled(value)
-            
-            # Play test sound if enabled
-            if value and hasattr(app, 'sound_manager'):
-                app.sound_manager.play_sound('button_click')
+
+            if hasattr(app, 'sound_manager'):
+                app.sound_manager.set_sound_enabled(value)
+                # Play test sound if enabled
+                if value:
+                    app.sound_manager.play_sound('button_click')
     
     def on_volume_change(self, slider, value):
         """Handle volume change"""
@@ -221,8 +220,9 @@ class SettingsScreen(Screen):
                 app.sound_manager.play_sound('button_click')
             
             # Reset all data to defaults
-            app.data_manager.data = app.data_manager.default_data.copy()
-            app.data_manager.save_data()
+            app.data_manager.reset_data()
+            if hasattr(app, 'sound_manager'):
+                app.sound_manager.apply_settings(app.data_manager)
             
             # Reload settings display
             self.load_settings()
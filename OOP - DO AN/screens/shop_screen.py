@@ -1,17 +1,101 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.button import Button
+from kivy.uix.image import Image
 from kivy.uix.label import Label
-from kivy.uix.popup import Popup
 from kivy.metrics import dp
+from kivy.clock import Clock
 from kivy.app import App
 from kivy.logger import Logger
 
+ROW_HEIGHT = 60
+PLACEHOLDER_COLOR = (1, 1, 1, 0.15)
+
+
+class ShopRow(RecycleDataViewBehavior, BoxLayout):
+    """A recycled shop row; shows whichever item's data it is given"""
+
+    def __init__(self, **kwargs):
+        super().__init__(padding=5, spacing=10, **kwargs)
+        self.list_view = None
+        self.item_id = None
+        self.action = None
+
+        # Translucent box until the item's thumbnail is ready
+        self.thumbnail = Image(size_hint=(None, 1), width=dp(ROW_HEIGHT - 10), color=PLACEHOLDER_COLOR)
+        self.label = Label(markup=True, halign='left', valign='middle', size_hint=(0.6, 1))
+        self.label.bind(size=self.label.setter('text_size'))
+        self.button = Button(size_hint=(0.4, 1))
+        self.button.bind(on_press=self.on_button_press)
+        self.add_widget(self.thumbnail)
+        self.add_widget(self.label)
+        self.add_widget(self.button)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.list_view = rv
+        self.item_id = data['item_id']
+        self.action = data['action']
+        self.label.text = data['text']
+        self.button.text = data['button_text']
+        self.button.disabled = data['action'] is None
+        if data['thumbnail']:
+            self.thumbnail.source = data['thumbnail']
+            self.thumbnail.color = (1, 1, 1, 1)
+        else:
+            self.thumbnail.source = ''
+            self.thumbnail.color = PLACEHOLDER_COLOR
+            if rv.on_thumbnail_needed:
+                rv.on_thumbnail_needed(self.item_id)
+
+    def on_button_press(self, *args):
+        if self.action and self.list_view.on_row_action:
+            self.list_view.on_row_action(self.item_id, self.action)
+
+
+class ShopList(RecycleView):
+    """Virtualized item list: only rows on screen exist as widgets"""
+
+    def __init__(self, on_row_action=None, on_thumbnail_needed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.on_row_action = on_row_action
+        # Called for rows shown without a thumbnail, so only visible ones are made
+        self.on_thumbnail_needed = on_thumbnail_needed
+        self.viewclass = ShopRow
+        layout = RecycleBoxLayout(orientation='vertical', spacing=10, size_hint_y=None,
+                                  default_size=(None, dp(ROW_HEIGHT)), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+    def update_rows(self, rows):
+        """Replace only the rows that changed; same-length lists keep their views"""
+        data = self.data
+        if len(data) != len(rows):
+            self.data = rows
+            return
+        for index, row in enumerate(rows):
+            if data[index] != row:
+                data[index] = row
+
+    def set_thumbnail(self, item_id, path):
+        for index, row in enumerate(self.data):
+            if row['item_id'] == item_id:
+                self.data[index] = {**row, 'thumbnail': path}
+                return
+
+
 class ShopScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.current_tab = 'skin'  # Default tab
+        # Tab and data version the list was last built for
+        self.shown_tab = None
+        self.shown_version = None
+        # Item id -> thumbnail path, for thumbnails that are ready
+        self.thumbnails = {}
+        self.thumbnail_cache = None
         self.build_ui()
 
     def build_ui(self):
@@ -35,11 +119,9 @@ class ShopScreen(Screen):
         self.main_layout.add_widget(tab_layout)
 
         # Scrollable item list
-        scroll = ScrollView(size_hint=(1, 0.65))
-        self.item_container = BoxLayout(orientation='vertical', spacing=10, size_hint_y=None)
-        self.item_container.bind(minimum_height=self.item_container.setter('height'))
-        scroll.add_widget(self.item_container)
-        self.main_layout.add_widget(scroll)
+        self.shop_list = ShopList(on_row_action=self.on_row_action,
+                                  on_thumbnail_needed=self.request_thumbnail, size_hint=(1, 0.65))
+        self.main_layout.add_widget(self.shop_list)
 
         # Back button
         back_btn = Button(text='← Back', size_hint=(1, 0.1))
@@ -56,54 +138,70 @@ class ShopScreen(Screen):
         self.refresh_shop()
 
     def refresh_shop(self):
-        self.item_container.clear_widgets()
         app = App.get_running_app()
         dm = app.data_manager
+        if self.shown_tab == self.current_tab and self.shown_version == dm.version:
+            return
 
         points = dm.get_total_points()
-        purchased = dm.get_purchased_items()
-        items = [item for item in dm.get_shop_items() if item['type'] == self.current_tab]
+        items = dm.catalog.of_type(self.current_tab)
 
         # Chọn đúng loại đã trang bị
         equipped = dm.get_equipped_skin() if self.current_tab == 'skin' else dm.get_equipped_background()
 
         self.points_label.text = f'[b]Points: {points}[/b]'
 
-        for item in items:
-            item_id = item['id']
-            name = item['name']
-            cost = item['cost']
-
-            box = BoxLayout(size_hint_y=None, height=dp(60), padding=5, spacing=10)
-
-            label = Label(
-                text=f'{name} [color=ffffaa]{cost} pts[/color]',
-                markup=True,
-                halign='left',
-                valign='middle',
-                size_hint=(0.6, 1)
-            )
-            label.bind(size=label.setter('text_size'))
-
-            btn = Button(size_hint=(0.4, 1))
-
-            if item_id in purchased:
-                if item_id == equipped:
-                    btn.text = 'Using'
-                    btn.disabled = True
-                else:
-                    btn.text = 'Use'
-                    btn.bind(on_press=lambda b, i=item_id: self.use_item(i))
+        rows = [self.build_row(item, dm.has_purchased(item['id']), equipped, points) for item in items]
+        if self.shown_tab != self.current_tab:
+            self.shop_list.data = rows
+            self.shop_list.scroll_y = 1
+        else:
+            self.shop_list.update_rows(rows)
+        self.shown_tab = self.current_tab
+        self.shown_version = dm.version
+
+    def build_row(self, item, owned, equipped, points):
+        """Data for one ShopRow"""
+        cost = item['cost']
+        if owned:
+            if item['id'] == equipped:
+                button_text, action = 'Using', None
             else:
-                btn.text = f'Buy ({cost})'
-                if cost <= points:
-                    btn.bind(on_press=lambda b, i=item_id: self.buy_item(i))
-                else:
-                    btn.bind(on_press=lambda b: self.show_popup("Not enough points!"))
-
-            box.add_widget(label)
-            box.add_widget(btn)
-            self.item_container.add_widget(box)
+                button_text, action = 'Use', 'use'
+        else:
+            button_text = f'Buy ({cost})'
+            action = 'buy' if cost <= points else 'not_enough'
+        return {
+            'item_id': item['id'],
+            'text': f"{item['name']} [color=ffffaa]{cost} pts[/color]",
+            'button_text': button_text,
+            'action': action,
+            'thumbnail': self.thumbnails.get(item['id']),
+        }
+
+    def request_thumbnail(self, item_id):
+        dm = App.get_running_app().data_manager
+        if self.thumbnail_cache is None:
+            # Pulls in Pillow, so only once a row actually needs a thumbnail
+            from utils.thumbnail_cache import ThumbnailCache
+            self.thumbnail_cache = ThumbnailCache(dm.data_dir('thumbnails'))
+        item = dm.get_item_by_id(item_id)
+        path = self.thumbnail_cache.request(item['image'], lambda source, p: self.on_thumbnail_ready(item_id, p))
+        if path:
+            # Already on disk: fill the row in on the next frame, not mid-refresh
+            Clock.schedule_once(lambda dt: self.on_thumbnail_ready(item_id, path))
+
+    def on_thumbnail_ready(self, item_id, path):
+        self.thumbnails[item_id] = path
+        self.shop_list.set_thumbnail(item_id, path)
+
+    def on_row_action(self, item_id, action):
+        if action == 'use':
+            self.use_item(item_id)
+        elif action == 'buy':
+            self.buy_item(item_id)
+        else:
+            self.show_popup("Not enough points!")
 
     def buy_item(self, item_id):
         app = App.get_running_app()
@@ -135,17 +233,15 @@ class ShopScreen(Screen):
         self.refresh_shop()
 
     def preview_item(self, item_id):
-        app = App.get_running_app()
-        if item_id.startswith("bo_"):
-            path = f"assets/images/characters/{item_id}.png"
-        elif item_id.startswith("background_"):
-            path = f"assets/images/backgrounds/{item_id}.png"
-        else:
+        item = App.get_running_app().data_manager.get_item_by_id(item_id)
+        if not item:
             return
+        path = self.thumbnails.get(item_id, item['image'])
         Logger.info(f"Previewing: {path}")
         # Hiển thị ở một nơi nào đó (nếu bạn muốn)
 
     def show_popup(self, message):
+        from kivy.uix.popup import Popup
         popup = Popup(title='Shop',
                       content=Label(text=message),
                       size_hint=(None, None), size=(300, 200))
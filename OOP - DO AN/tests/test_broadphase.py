@@ -0,0 +1,74 @@
+"""
+Broadphase tests for When Cows Fly
+"""
+
+import random
+import unittest
+
+from utils.broadphase import SweepIndex
+from utils.game_world import Entity, GameWorld, COW_START_X
+
+
+class SweepIndexTest(unittest.TestCase):
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(3)
+        entities = [Entity(rng.uniform(-100, 600), 0, rng.choice([20, 35, 80]), 10) for _ in range(300)]
+        wire = Entity(0, 0, 540, 20)
+        index = SweepIndex()
+        index.rebuild(entities + [wire])
+        for _ in range(50):
+            left = rng.uniform(-100, 600)
+            right = left + rng.uniform(0, 150)
+            expected = {id(e) for e in entities if e.right >= left and e.x <= right} | {id(wire)}
+            self.assertEqual({id(e) for e in index.query(left, right)}, expected)
+
+    def test_entity_reaching_in_from_the_left_is_found(self):
+        index = SweepIndex()
+        wide_left = Entity(0, 0, 80, 10)
+        index.rebuild([wide_left, Entity(300, 0, 20, 10)])
+        self.assertEqual(index.query(70, 90), [wide_left])
+
+    def test_wide_entities_are_always_returned_first(self):
+        wire = Entity(0, 0, 540, 20)
+        barrier = Entity(100, 0, 20, 10)
+        index = SweepIndex()
+        index.rebuild([barrier, wire])
+        self.assertEqual(index.query(100, 250), [wire, barrier])
+        self.assertEqual(index.query(1000, 1100), [wire])
+
+
+class HolesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = GameWorld(540, 960, seed=4)
+        self.world.cow.game_started = True
+
+    def assert_holes_sorted(self):
+        xs = [hole.x for hole in self.world.holes]
+        self.assertEqual(xs, sorted(xs))
+        self.assertEqual(set(map(id, self.world.holes)),
+                         {id(o) for o in self.world.obstacles if o.obstacle_type == 'hole'})
+
+    def test_holes_stay_sorted_while_spawning_and_despawning(self):
+        for tick in range(3000):
+            if tick % 40 == 0:
+                self.world.spawn_obstacle('hole')
+            self.world.lives = 3
+            self.world.step(1 / 60)
+            self.assert_holes_sorted()
+
+    def test_cow_over_and_past_the_leftmost_hole(self):
+        self.assertFalse(self.world.is_cow_in_hole())
+        hole = self.world.spawn_obstacle('hole')
+        hole.x = self.world.cow.center_x - hole.width
+        self.assertTrue(self.world.is_cow_in_hole())
+        self.assertFalse(self.world.is_cow_pass_hole())
+        hole.x = COW_START_X * 0.8 - hole.width
+        self.assertTrue(self.world.is_cow_pass_hole())
+        hole.x = self.world.cow.center_x + 10
+        self.assertFalse(self.world.is_cow_in_hole())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Entity pool tests for When Cows Fly
+"""
+
+import unittest
+
+from utils.entity_pool import EntityPool
+
+
+class Thing:
+    made = 0
+
+    def __init__(self, value):
+        Thing.made += 1
+        self.value = value
+
+    def reset(self, value):
+        self.value = value
+
+
+class EntityPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        Thing.made = 0
+        self.pool = EntityPool(Thing)
+
+    def test_preallocated_objects_are_reset_and_reused(self):
+        self.pool.preallocate('kite', 2, 0)
+        self.assertEqual(Thing.made, 2)
+        first = self.pool.acquire('kite', 5)
+        second = self.pool.acquire('kite', 6)
+        self.assertEqual((first.value, second.value), (5, 6))
+        self.assertEqual(Thing.made, 2)
+        self.assertEqual((self.pool.hits, self.pool.misses), (2, 0))
+
+    def test_empty_free_list_constructs(self):
+        thing = self.pool.acquire('bird', 3)
+        self.assertEqual((thing.value, Thing.made), (3, 1))
+        self.assertEqual((self.pool.hits, self.pool.misses), (0, 1))
+
+    def test_released_object_comes_back_for_its_key_only(self):
+        thing = self.pool.acquire('bird', 1)
+        self.pool.release('bird', thing)
+        self.assertIsNot(self.pool.acquire('kite', 2), thing)
+        self.assertIs(self.pool.acquire('bird', 3), thing)
+        self.assertEqual(thing.value, 3)
+
+    def test_stats(self):
+        self.pool.preallocate('kite', 1, 0)
+        self.pool.release('kite', self.pool.acquire('kite', 1))
+        self.pool.acquire('bird', 1)
+        stats = self.pool.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['released']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['free'], {'kite': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
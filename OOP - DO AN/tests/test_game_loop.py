@@ -0,0 +1,92 @@
+"""
+Fixed-step loop tests for When Cows Fly
+"""
+
+import unittest
+
+from utils.game_loop import FixedStepLoop
+
+
+class FakeWorld:
+    """Counts steps and can end the run after a given number of them"""
+
+    def __init__(self, over_after=None):
+        self.steps = []
+        self.over_after = over_after
+        self.is_over = False
+
+    def step(self, dt, inputs):
+        self.steps.append((dt, list(inputs)))
+        if self.over_after is not None and len(self.steps) >= self.over_after:
+            self.is_over = True
+        return [('step', len(self.steps))]
+
+
+class FakeRecorder:
+    def __init__(self):
+        self.inputs = []
+
+    def record(self, tick, action):
+        self.inputs.append((tick, action))
+
+
+class FixedStepLoopTest(unittest.TestCase):
+
+    def test_steps_are_fixed_and_remainder_becomes_alpha(self):
+        world = FakeWorld()
+        loop = FixedStepLoop(world, tick_rate=60)
+        events = loop.advance(2.5 / 60)
+        self.assertEqual(len(world.steps), 2)
+        self.assertTrue(all(dt == 1 / 60 for dt, inputs in world.steps))
+        self.assertEqual(events, [('step', 1), ('step', 2)])
+        self.assertAlmostEqual(loop.alpha, 0.5)
+
+        loop.advance(0.6 / 60)
+        self.assertEqual(len(world.steps), 3)
+        self.assertAlmostEqual(loop.alpha, 0.1)
+
+    def test_short_frames_accumulate(self):
+        world = FakeWorld()
+        loop = FixedStepLoop(world, tick_rate=60)
+        for _ in range(3):
+            loop.advance(0.4 / 60)
+        self.assertEqual(len(world.steps), 1)
+        self.assertAlmostEqual(loop.alpha, 0.2)
+
+    def test_catch_up_is_capped_and_backlog_dropped(self):
+        world = FakeWorld()
+        loop = FixedStepLoop(world, tick_rate=60, max_steps=5)
+        loop.advance(1.0)
+        self.assertEqual(len(world.steps), 5)
+        self.assertEqual(loop.tick, 5)
+        self.assertLess(loop.accumulator, loop.step_dt)
+        self.assertAlmostEqual(loop.dropped_time + loop.accumulator, 1.0 - 5 / 60)
+        self.assertTrue(0.0 <= loop.alpha < 1.0)
+
+    def test_stops_when_the_run_ends(self):
+        world = FakeWorld(over_after=2)
+        loop = FixedStepLoop(world, tick_rate=60)
+        loop.advance(4 / 60)
+        self.assertEqual(len(world.steps), 2)
+        self.assertEqual(loop.alpha, 0.0)
+
+    def test_inputs_reach_the_next_step_and_the_recorder(self):
+        world = FakeWorld()
+        loop = FixedStepLoop(world, tick_rate=60)
+        loop.recorder = FakeRecorder()
+        loop.advance(1 / 60)
+        loop.push_input('jump')
+        loop.advance(1 / 60)
+        self.assertEqual([inputs for dt, inputs in world.steps], [[], ['jump']])
+        self.assertEqual(loop.recorder.inputs, [(1, 'jump')])
+
+    def test_restart_counts_ticks_from_zero(self):
+        loop = FixedStepLoop(FakeWorld(), tick_rate=60)
+        loop.push_input('jump')
+        loop.advance(2.5 / 60)
+        loop.restart()
+        self.assertEqual((loop.tick, loop.accumulator, loop.pending_inputs), (0, 0.0, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Game world tests for When Cows Fly
+"""
+
+import unittest
+
+from utils.game_world import GameWorld, GROUND_LEVEL, HIT_LIFE_DELAY, START_LIVES
+
+WORLD_SIZE = (540, 960)
+DT = 1 / 60
+
+
+def kinds(events):
+    return [kind for kind, payload in events]
+
+
+class GameWorldStepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = GameWorld(*WORLD_SIZE, seed=1)
+
+    def start(self):
+        """Let the run begin without the cow leaving the ground"""
+        self.world.cow.game_started = True
+
+    def place_on_cow(self, entity):
+        cow = self.world.cow
+        entity.x, entity.y = cow.x + 10, cow.y + 10
+        entity.save_position()
+
+    def test_nothing_happens_before_the_first_jump(self):
+        for _ in range(600):
+            self.assertEqual(self.world.step(DT), [])
+        self.assertEqual(self.world.obstacles, [])
+        self.assertEqual(self.world.cow.y, GROUND_LEVEL)
+
+    def test_jump_lands_back_on_the_ground(self):
+        self.world.step(DT, ['jump'])
+        self.assertGreater(self.world.cow.y, GROUND_LEVEL)
+        for _ in range(120):
+            self.world.step(DT)
+        self.assertEqual(self.world.cow.y, GROUND_LEVEL)
+        self.assertEqual(self.world.cow.velocity_y, 0)
+
+    def test_hit_costs_a_life_after_the_delay(self):
+        self.start()
+        barrier = self.world.spawn_obstacle('barrier')
+        self.place_on_cow(barrier)
+
+        events = self.world.step(DT)
+        self.assertIn(('hit', barrier), events)
+        self.assertNotIn(barrier, self.world.obstacles)
+        self.assertEqual(self.world.lives, START_LIVES)
+
+        lost = []
+        for _ in range(int(HIT_LIFE_DELAY / DT) + 2):
+            lost += [payload for kind, payload in self.world.step(DT) if kind == 'life_lost']
+        self.assertEqual(lost, [START_LIVES - 1])
+        self.assertEqual(self.world.lives, START_LIVES - 1)
+        self.assertFalse(self.world.is_over)
+
+    def test_losing_the_last_life_ends_the_run(self):
+        self.start()
+        self.world.lives = 1
+        self.world.pending_life_losses.append(DT / 2)
+
+        events = self.world.step(DT)
+        self.assertEqual(kinds(events), ['life_lost', 'game_over'])
+        self.assertEqual(events[-1], ('game_over', 'lives'))
+        self.assertTrue(self.world.is_over)
+        self.assertEqual(self.world.step(DT), [])
+
+    def test_electric_wire_ends_the_run_at_once(self):
+        self.start()
+        self.world.spawn_obstacle('electric_wire')
+        self.world.cow.y = WORLD_SIZE[1] - 100
+
+        events = self.world.step(DT)
+        self.assertEqual(events[-1], ('game_over', 'electric_wire'))
+        self.assertEqual(self.world.lives, START_LIVES)
+
+    def test_collecting_grass_scores(self):
+        self.start()
+        grass = self.world.spawn_collectible()
+        self.place_on_cow(grass)
+
+        events = self.world.step(DT)
+        self.assertIn(('collect', grass), events)
+        self.assertEqual(self.world.score, 1)
+        self.assertNotIn(grass, self.world.collectibles)
+
+    def test_reset_releases_entities_to_the_pools(self):
+        self.start()
+        obstacle = self.world.spawn_obstacle('kite')
+        self.world.reset(seed=2)
+        self.assertEqual(self.world.obstacles, [])
+        self.assertIs(self.world.spawn_obstacle('kite'), obstacle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Replay tests for When Cows Fly
+"""
+
+import json
+import random
+import unittest
+
+from utils.game_loop import FixedStepLoop
+from utils.game_world import GameWorld
+from utils.replay import Replay, ReplayDriver, ReplayRecorder
+
+TICK_RATE = 60
+MAX_TICKS = 20000
+
+
+def record_run(seed, jump_chance=0.03):
+    """Play a run with random jumps the way GameScreen does; returns the replay file data"""
+    world = GameWorld(540, 960)
+    world.reset(seed=seed)
+    world.spawn_obstacle('electric_wire')
+    loop = FixedStepLoop(world, TICK_RATE)
+    recorder = ReplayRecorder(world, TICK_RATE)
+    loop.recorder = recorder
+    inputs = random.Random(seed)
+    # Uneven frame times, as on a device
+    while not world.is_over and loop.tick < MAX_TICKS:
+        if inputs.random() < jump_chance or loop.tick == 0:
+            loop.push_input('jump')
+        loop.advance(inputs.uniform(0.5, 2.5) / TICK_RATE)
+    recorder.finish(world, loop.tick)
+    return json.loads(json.dumps(recorder.to_dict()))
+
+
+class ReplayTest(unittest.TestCase):
+
+    def test_replays_match_their_recorded_runs(self):
+        for seed in range(10):
+            data = record_run(seed)
+            driver = ReplayDriver(Replay(data))
+            driver.run()
+            self.assertTrue(driver.matches_result(), f"seed {seed}: {data['result']}")
+
+    def test_different_result_does_not_match(self):
+        data = record_run(1)
+        data['result']['score'] += 1
+        driver = ReplayDriver(Replay(data))
+        driver.run()
+        self.assertFalse(driver.matches_result())
+
+    def test_input_ticks_round_trip_through_deltas(self):
+        recorder = ReplayRecorder(GameWorld(540, 960, seed=5), TICK_RATE)
+        for tick in (3, 3, 10, 250):
+            recorder.record(tick, 'jump')
+        replay = Replay(recorder.to_dict())
+        self.assertEqual(replay.inputs_by_tick, {3: ['jump', 'jump'], 10: ['jump'], 250: ['jump']})
+        self.assertEqual(replay.last_input_tick, 250)
+
+    def test_unknown_version_is_rejected(self):
+        data = record_run(2)
+        data['version'] += 1
+        with self.assertRaises(ValueError):
+            Replay(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Storage tests for When Cows Fly
+
+Run from the game folder:
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.event_journal import EventJournal
+from utils.storage import JsonStorage, SqliteStorage
+
+SHIPPED_SAVE = os.path.join('assets', 'data', 'game_data.json')
+
+
+class LegacyImportTest(unittest.TestCase):
+    """A JSON save imported into SQLite must survive the first run being killed"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.json_file = os.path.join(self.directory, 'game_data.json')
+        self.db_file = os.path.join(self.directory, 'game_data.db')
+        shutil.copy(SHIPPED_SAVE, self.json_file)
+        with open(SHIPPED_SAVE) as f:
+            self.saved = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_storage(self):
+        return SqliteStorage(self.db_file, legacy=JsonStorage(self.json_file))
+
+    def test_change_before_first_save_keeps_imported_data(self):
+        storage = self.open_storage()
+        data, events = storage.load()
+        self.assertEqual(data['total_points'], self.saved['total_points'])
+        # A volume change, then the app is killed before any full save
+        self.assertTrue(storage.append([{'type': 'setting', 'key': 'volume', 'value': 0.5}]))
+        storage.close()
+
+        storage = self.open_storage()
+        data, events = storage.load()
+        storage.close()
+        self.assertEqual(data['total_points'], self.saved['total_points'])
+        self.assertEqual(data['best_score'], self.saved['best_score'])
+        self.assertEqual(data['purchased_items'], self.saved['purchased_items'])
+        self.assertEqual(data['equipped_background'], self.saved['equipped_background'])
+        self.assertEqual(data['settings']['volume'], 0.5)
+        self.assertFalse(storage.needs_save())
+
+    def test_import_includes_journal_events(self):
+        journal = JsonStorage(self.json_file).journal
+        journal.append([{'type': 'points', 'amount': 4}])
+        journal.close()
+
+        storage = self.open_storage()
+        storage.load()
+        storage.close()
+
+        storage = self.open_storage()
+        data, events = storage.load()
+        storage.close()
+        self.assertEqual(data['total_points'], self.saved['total_points'] + 4)
+        self.assertEqual(events, [])
+
+
+class EventJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'game_data.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_compact_skips_corrupt_lines(self):
+        journal = EventJournal(self.path)
+        journal.append([{'type': 'points', 'amount': 1}])
+        with open(self.path, 'a') as f:
+            f.write('{"type": "points", "amo\n')
+        journal.append([{'type': 'points', 'amount': 2}, {'type': 'points', 'amount': 3}])
+        journal.compact(2)
+        journal.close()
+
+        with open(self.path) as f:
+            self.assertEqual([json.loads(line)['amount'] for line in f], [3])
+        self.assertEqual(journal.pending, 1)
+
+    def test_replay_drops_torn_tail(self):
+        journal = EventJournal(self.path)
+        journal.append([{'type': 'points', 'amount': 1}, {'type': 'points', 'amount': 2}])
+        journal.close()
+        with open(self.path, 'a') as f:
+            f.write('{"type": "poi')
+
+        journal = EventJournal(self.path)
+        self.assertEqual([event['amount'] for event in journal.replay(1)], [2])
+        journal.append([{'type': 'points', 'amount': 3}])
+        journal.close()
+        self.assertEqual([event['seq'] for event in EventJournal(self.path).replay(0)], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Startup import check for When Cows Fly
+Follows the module-level imports of everything that runs before the main
+menu is interactive (main.py and the screens built at startup) and fails
+if that path pulls in another screen, a heavy widget or library module,
+or imports a name it never uses. Imports made inside functions are
+deferred and are not followed.
+
+Run from the game folder (no Kivy needed):
+    python -m tools.check_startup_imports
+"""
+
+import ast
+import os
+import sys
+
+# Modules executed before the main menu is interactive
+STARTUP_MODULES = ('main', 'screens.loading_screen', 'screens.main_menu_screen')
+# Modules only the later screens need; importing them at startup wastes time
+HEAVY_MODULES = (
+    'kivy.uix.popup',
+    'kivy.uix.recycleview',
+    'kivy.uix.scrollview',
+    'kivy.uix.slider',
+    'kivy.uix.switch',
+    'kivy.uix.togglebutton',
+    'PIL',
+    'numpy',
+    'utils.thumbnail_cache',
+)
+
+
+def module_path(name):
+    """Source file of a module in the game folder, or None for anything else"""
+    path = name.replace('.', os.sep) + '.py'
+    return path if os.path.exists(path) else None
+
+
+def module_imports(tree):
+    """(module, bound names) for each import run when the module loads"""
+    imports = []
+    # Top-level statements, including those under if/try, but not functions or classes
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append((alias.name, [alias.asname or alias.name.split('.')[0]]))
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                imports.append((node.module, [alias.asname or alias.name]))
+        elif isinstance(node, (ast.If, ast.Try, ast.With)):
+            for field in ('body', 'orelse', 'finalbody', 'handlers'):
+                pending.extend(getattr(node, field, []))
+        elif isinstance(node, ast.ExceptHandler):
+            pending.extend(node.body)
+    return imports
+
+
+def used_names(tree):
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+def is_screen_module(tree):
+    return any(isinstance(node, ast.ClassDef) and node.name.endswith('Screen') for node in tree.body)
+
+
+def is_heavy(name):
+    return any(name == heavy or name.startswith(heavy + '.') for heavy in HEAVY_MODULES)
+
+
+def check():
+    problems = []
+    seen = set()
+    pending = [(name, 'startup') for name in STARTUP_MODULES]
+    while pending:
+        name, importer = pending.pop(0)
+        if name in seen:
+            continue
+        seen.add(name)
+
+        if is_heavy(name):
+            problems.append(f"{importer} imports heavy module {name}")
+        path = module_path(name)
+        if path is None:
+            continue
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        # Shared widgets such as screens.hover_button are fine; other screens are not
+        if name not in STARTUP_MODULES and is_screen_module(tree):
+            problems.append(f"{importer} imports screen module {name}")
+        used = used_names(tree)
+        for imported, bound in module_imports(tree):
+            for alias in bound:
+                if alias not in used:
+                    problems.append(f"{name} never uses {alias}, imported from {imported}")
+            pending.append((imported, name))
+
+    return sorted(seen), problems
+
+
+def main():
+    if not os.path.exists('main.py'):
+        print("Run this from the game folder")
+        return 2
+    modules, problems = check()
+    project = [name for name in modules if module_path(name)]
+    print(f"Startup path: {len(project)} game modules, {len(modules) - len(project)} external")
+    for problem in problems:
+        print(f"  {problem}")
+    if problems:
+        print(f"{len(problems)} problem(s) found")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Asset preprocessing for When Cows Fly
+Writes resized copies of the game images for each resolution tier into
+assets/build/<tier>/, packs the character skins and icons of each tier
+into Kivy atlases under assets/build/<tier>/atlas/, and writes
+assets/build/manifest.json describing them. At runtime
+utils/asset_resolver.py picks the tier that fits the window.
+
+Run from the game folder (needs Pillow):
+    python -m tools.preprocess_assets
+    python -m tools.preprocess_assets --lossy    # opaque images as JPEG
+    python -m tools.preprocess_assets --force    # rebuild everything
+
+Images whose source is unchanged since the last run are skipped.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from PIL import Image
+from kivy.atlas import Atlas
+
+from utils.asset_resolver import BUILD_DIR, MANIFEST_PATH, MANIFEST_VERSION, TIERS
+
+SOURCE_DIR = 'assets/images'
+# Largest size each folder's images are drawn at on a 1280x720 window;
+# tiers scale these
+DISPLAY_SIZES = {
+    'characters': (300, 300),
+    'backgrounds': (1280, 720),
+    'ground': (1280, 960),
+    'icons': (128, 128),
+}
+JPEG_QUALITY = 85
+# Folders whose images are packed into one atlas per tier
+ATLAS_FOLDERS = ('characters', 'icons')
+ATLAS_PAGE_SIZE = 2048
+
+
+def source_images():
+    for folder in sorted(DISPLAY_SIZES):
+        directory = os.path.join(SOURCE_DIR, folder)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith('.png'):
+                yield folder, f"{SOURCE_DIR}/{folder}/{name}"
+
+
+def is_opaque(image):
+    if image.mode in ('RGB', 'L'):
+        return True
+    if image.mode == 'RGBA':
+        return image.getchannel('A').getextrema()[0] == 255
+    return False
+
+
+def build_variant(image, box, output_base, lossy):
+    """Save image scaled to fit box; returns (path, size)"""
+    variant = image.copy()
+    # Never upscale: thumbnail() only shrinks
+    variant.thumbnail(box, Image.LANCZOS)
+    if lossy and is_opaque(variant):
+        path, stale = output_base + '.jpg', output_base + '.png'
+        variant.convert('RGB').save(path, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    else:
+        path, stale = output_base + '.png', output_base + '.jpg'
+        variant.save(path, 'PNG', optimize=True)
+    # Drop the variant an earlier run wrote in the other format
+    if os.path.exists(stale):
+        os.remove(stale)
+    return path, variant.size
+
+
+def build_atlas(folder, tier, entries):
+    """Pack one folder's variants of a tier into an atlas; returns its base path"""
+    atlas_base = f"{BUILD_DIR}/{tier}/atlas/{folder}"
+    os.makedirs(os.path.dirname(atlas_base), exist_ok=True)
+    paths = [entry['variants'][tier]['path'] for entry in entries.values()]
+    if not Atlas.create(atlas_base, paths, ATLAS_PAGE_SIZE):
+        raise RuntimeError(f"Could not pack atlas {atlas_base}")
+    # Atlas ids are the image file names without extension
+    for source, entry in entries.items():
+        image_id = os.path.splitext(os.path.basename(source))[0]
+        entry['variants'][tier]['atlas'] = f"atlas://{atlas_base}/{image_id}"
+    return atlas_base
+
+
+def preprocess(lossy=False, force=False):
+    manifest = {'version': MANIFEST_VERSION, 'tiers': TIERS, 'lossy': lossy, 'assets': {}}
+    previous = {}
+    if not force and os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH, 'r') as f:
+            old = json.load(f)
+        if old.get('version') == MANIFEST_VERSION and old.get('lossy') == lossy and old.get('tiers') == TIERS:
+            previous = old['assets']
+
+    built = skipped = 0
+    changed_folders = set()
+    for folder, source in source_images():
+        stat = os.stat(source)
+        entry = previous.get(source)
+        if (entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['bytes'] == stat.st_size
+                and all(os.path.exists(v['path']) for v in entry['variants'].values())):
+            manifest['assets'][source] = entry
+            skipped += 1
+            continue
+
+        with Image.open(source) as image:
+            image.load()
+            entry = {'mtime_ns': stat.st_mtime_ns, 'bytes': stat.st_size, 'size': list(image.size), 'variants': {}}
+            width, height = DISPLAY_SIZES[folder]
+            for tier, scale in TIERS.items():
+                box = (round(width * scale), round(height * scale))
+                relative = os.path.splitext(os.path.relpath(source, SOURCE_DIR))[0]
+                output_base = os.path.join(BUILD_DIR, tier, relative).replace(os.sep, '/')
+                os.makedirs(os.path.dirname(output_base), exist_ok=True)
+                path, size = build_variant(image, box, output_base, lossy)
+                entry['variants'][tier] = {'path': path, 'size': list(size), 'bytes': os.path.getsize(path)}
+        manifest['assets'][source] = entry
+        changed_folders.add(folder)
+        built += 1
+        print(f"{source}: {entry['size'][0]}x{entry['size'][1]} -> "
+              + ', '.join(f"{tier} {v['size'][0]}x{v['size'][1]}" for tier, v in entry['variants'].items()))
+
+    for folder in ATLAS_FOLDERS:
+        entries = {source: entry for source, entry in manifest['assets'].items()
+                   if source.startswith(f"{SOURCE_DIR}/{folder}/")}
+        if not entries:
+            continue
+        for tier in TIERS:
+            atlas_file = f"{BUILD_DIR}/{tier}/atlas/{folder}.atlas"
+            previous_entries = previous.keys() & entries.keys()
+            if folder not in changed_folders and previous_entries == entries.keys() and os.path.exists(atlas_file):
+                continue
+            print(f"Packed {build_atlas(folder, tier, entries)}.atlas ({len(entries)} images)")
+
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Built {built}, unchanged {skipped}; manifest written to {MANIFEST_PATH}")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build resized image variants for each resolution tier")
+    parser.add_argument('--lossy', action='store_true', help="save opaque images as JPEG")
+    parser.add_argument('--force', action='store_true', help="rebuild unchanged images too")
+    args = parser.parse_args(argv)
+    preprocess(lossy=args.lossy, force=args.force)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
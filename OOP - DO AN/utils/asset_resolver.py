@@ -0,0 +1,83 @@
+"""
+Asset Resolver for When Cows Fly
+Maps image paths to the preprocessed variant for the current window size
+(see tools/preprocess_assets.py). Character skins and icons resolve to
+atlas:// URIs, so every screen shares one texture per atlas page.
+Without a manifest, or for images it does not list, paths are returned
+unchanged.
+"""
+
+import json
+import os
+
+from kivy.logger import Logger
+
+BUILD_DIR = 'assets/build'
+MANIFEST_PATH = BUILD_DIR + '/manifest.json'
+MANIFEST_VERSION = 1
+# Tier name -> scale of the 1280x720 reference size, smallest first
+TIERS = {'sd': 0.5, 'hd': 1.0, 'fhd': 1.5}
+REFERENCE_LONG_SIDE = 1280
+
+
+def tier_for_window(window_size):
+    """Smallest tier covering the window's long side; the largest past that
+
+    Sprites are drawn far smaller than the window, so even on 1440x3200
+    screens the largest tier is sharper than needed and far cheaper to
+    decode than the original images.
+    """
+    long_side = max(window_size)
+    for tier, scale in TIERS.items():
+        if REFERENCE_LONG_SIDE * scale >= long_side:
+            return tier
+    return list(TIERS)[-1]
+
+
+class AssetResolver:
+    """Resolves original asset paths to the variant of the selected tier"""
+
+    def __init__(self, manifest_path=MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self.assets = None
+        self.tier = None
+
+    def load_manifest(self):
+        self.assets = {}
+        if not os.path.exists(self.manifest_path):
+            Logger.info("AssetResolver: No asset manifest, using original images")
+            return
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                self.assets = manifest['assets']
+            else:
+                Logger.warning("AssetResolver: Asset manifest is outdated, using original images")
+        except Exception as e:
+            Logger.error(f"AssetResolver: Error loading asset manifest: {e}")
+
+    def select_tier(self, window_size):
+        self.tier = tier_for_window(window_size)
+        Logger.info(f"AssetResolver: Using tier {self.tier} for window {window_size}")
+
+    def resolve(self, path):
+        if self.tier is None:
+            return path
+        if self.assets is None:
+            self.load_manifest()
+        entry = self.assets.get(path)
+        if not entry:
+            return path
+        variant = entry['variants'].get(self.tier)
+        if not variant or not os.path.exists(variant['path']):
+            return path
+        return variant.get('atlas') or variant['path']
+
+
+# Shared resolver; main.py selects the tier once the window is sized
+asset_resolver = AssetResolver()
+
+
+def resolve_asset(path):
+    return asset_resolver.resolve(path)
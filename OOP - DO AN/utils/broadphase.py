@@ -0,0 +1,57 @@
+"""
+Broadphase for When Cows Fly
+Sort-by-x index so collision checks only look at entities near the cow
+"""
+
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+# Entities wider than this (the electric wire spans the whole screen) are
+# not worth sorting and are always returned by queries
+WIDE_ENTITY_WIDTH = 200
+
+_left_edge = attrgetter('x')
+
+
+class SweepIndex:
+    """Entities sorted by their left edge for x-range queries
+
+    Call rebuild() once per step after everything has moved; entities keep
+    almost the same order between steps, so the sort is close to linear.
+    query() then bisects to the entities whose x-extent can overlap the
+    requested range.
+    """
+
+    def __init__(self, wide_width=WIDE_ENTITY_WIDTH):
+        self.wide_width = wide_width
+        self.entities = []
+        self.lefts = []
+        self.wide = []
+        self.max_width = 0
+
+    def rebuild(self, entities):
+        narrow = []
+        wide = []
+        max_width = 0
+        for entity in entities:
+            if entity.width > self.wide_width:
+                wide.append(entity)
+            else:
+                narrow.append(entity)
+                if entity.width > max_width:
+                    max_width = entity.width
+        narrow.sort(key=_left_edge)
+        self.entities = narrow
+        self.lefts = [entity.x for entity in narrow]
+        self.wide = wide
+        self.max_width = max_width
+
+    def query(self, left, right):
+        """Entities whose [x, right] overlaps [left, right], wide ones first"""
+        lo = bisect_left(self.lefts, left - self.max_width)
+        hi = bisect_right(self.lefts, right)
+        found = list(self.wide)
+        for entity in self.entities[lo:hi]:
+            if entity.right >= left:
+                found.append(entity)
+        return found
@@ -1,18 +1,59 @@
 """
 Data Manager for When Cows Fly
-Handles saving and loading game data using JSON
+Handles saving and loading game data through a storage backend
+(see utils/storage.py)
+
+Setters apply a small event to the in-memory data and queue it for a
+background thread, which hands the queued events to the backend in one
+batch once changes have been quiet for SAVE_DELAY seconds (at most
+MAX_SAVE_DELAY after the first one). Repeated changes of one setting,
+such as a dragged volume slider, are coalesced into the last value.
+Full saves are only written when the backend asks for one. flush()
+writes everything pending immediately, e.g. when the app stops or is
+paused.
 """
 
-import json
+import copy
 import os
+import threading
+import time
 from kivy.logger import Logger
 from kivy.app import App
 
+from utils.file_utils import ensure_dir
+from utils.shop_catalog import build_catalog
+from utils.storage import create_storage
+from utils.tracer import traced
+
+SAVE_DELAY = 0.5
+MAX_SAVE_DELAY = 3.0
+
 class DataManager:
     """Manages game data persistence"""
 
     def __init__(self):
+        # Guards self.data and the event queue against the background writer
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        # Held while the backend is written, so events and snapshots land in order
+        self._write_lock = threading.Lock()
+        # Events applied to self.data but not yet handed to the backend
+        self._events = []
+        # A full save is needed / the writer has work waiting
+        self._dirty = False
+        self._save_pending = False
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._writer = None
+
+        # Bumped on every change so screens can cache views built from the data
+        self.version = 0
+        # Set view of data['purchased_items'] for O(1) ownership checks
+        self.owned_items = set()
+        self.catalog = build_catalog()
+
         self.data_file = self.get_data_path()
+        self.storage = create_storage(self.data_file)
         self.default_data = {
             'best_score': 0,
             'total_points': 0,
@@ -27,78 +68,200 @@ class DataManager:
         }
         self.load_data()
 
-        # Generate character skins: bo_0 to bo_19, cost 5 to 2000
-        self.shop_items = [
-            {'id': f'bo_{i}', 'name': f'Character {i}', 'type': 'skin', 'cost': 5 + i * 15} for i in range(20)
-        ]
-        # Add backgrounds: background_1 to background_10, cost 20 to 3000
-        self.shop_items += [
-            {'id': f'background_{i+1}', 'name': f'Background {i+1}', 'type': 'background', 'cost': 20 + i * 30} for i in range(10)
-        ]
-
     def get_data_path(self):
         try:
             app = App.get_running_app()
             if app:
-                user_data_dir = app.user_data_dir
-                if not os.path.exists(user_data_dir):
-                    os.makedirs(user_data_dir)
-                return os.path.join(user_data_dir, 'game_data.json')
+                return os.path.join(ensure_dir(app.user_data_dir), 'game_data.json')
         except Exception as e:
             Logger.warning(f"DataManager: Could not access user data dir: {e}")
         return 'game_data.json'
 
+    def data_dir(self, *parts):
+        """Path in the folder holding the save data, e.g. data_dir('replays', 'last_run.json')"""
+        return os.path.join(os.path.dirname(os.path.abspath(self.data_file)), *parts)
+
+    @traced('DataManager.load_data', 'io')
     def load_data(self):
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    loaded_data = json.load(f)
-                    self.data = {**self.default_data, **loaded_data}
-                    if 'settings' not in self.data:
-                        self.data['settings'] = self.default_data['settings']
-                    else:
-                        self.data['settings'] = {**self.default_data['settings'], **self.data['settings']}
-                Logger.info(f"DataManager: Data loaded successfully")
-            else:
-                Logger.info("DataManager: No save file found, using defaults")
-                self.data = self.default_data.copy()
+            loaded_data, events = self.storage.load()
         except Exception as e:
             Logger.error(f"DataManager: Error loading data: {e}")
-            self.data = self.default_data.copy()
+            loaded_data, events = None, []
 
+        if loaded_data is not None:
+            data = {**copy.deepcopy(self.default_data), **loaded_data}
+            if 'settings' not in data:
+                data['settings'] = copy.deepcopy(self.default_data['settings'])
+            else:
+                data['settings'] = {**self.default_data['settings'], **data['settings']}
+            Logger.info(f"DataManager: Data loaded successfully")
+        else:
+            Logger.info("DataManager: No save file found, using defaults")
+            data = copy.deepcopy(self.default_data)
+
+        for event in events:
+            self.apply_event(data, event)
+        with self._lock:
+            self.data = data
+            self.owned_items = set(data.get('purchased_items', []))
+            self.version += 1
+        if events:
+            Logger.info(f"DataManager: Recovered {len(events)} journal events")
+        if events or self.storage.needs_save():
+            self.mark_dirty()
+
+    def apply_event(self, data, event):
+        """Apply one change event to a data dict"""
+        kind = event['type']
+        if kind == 'points':
+            data['total_points'] = data.get('total_points', 0) + event['amount']
+        elif kind == 'best_score':
+            data['best_score'] = max(event['score'], data.get('best_score', 0))
+        elif kind == 'run':
+            data['best_score'] = max(event['score'], data.get('best_score', 0))
+            data['total_points'] = data.get('total_points', 0) + event['points']
+        elif kind == 'purchase':
+            data['total_points'] = data.get('total_points', 0) - event['cost']
+            data.setdefault('purchased_items', []).append(event['item'])
+        elif kind == 'equip':
+            data[f"equipped_{event['slot']}"] = event['item']
+        elif kind == 'setting':
+            data.setdefault('settings', {})[event['key']] = event['value']
+        elif kind == 'reset':
+            data.clear()
+            data.update(copy.deepcopy(self.default_data))
+        else:
+            Logger.warning(f"DataManager: Unknown data event '{kind}'")
+
+    def record(self, event):
+        """Apply an event to the data and queue it for the writer thread"""
+        with self._lock:
+            self.apply_event(self.data, event)
+            if event['type'] == 'purchase':
+                self.owned_items.add(event['item'])
+            elif event['type'] == 'reset':
+                self.owned_items.clear()
+            self.version += 1
+            last = self._events[-1] if self._events else None
+            if (event['type'] == 'setting' and last is not None
+                    and last['type'] == 'setting' and last['key'] == event['key']):
+                self._events[-1] = event
+            else:
+                self._events.append(event)
+            self._schedule_write()
+
+    def reset_data(self):
+        """Replace all game data with the defaults"""
+        self.record({'type': 'reset'})
+
+    def mark_dirty(self):
+        """Schedule a full background save; a burst of changes is written once"""
+        with self._lock:
+            self._dirty = True
+            self._schedule_write()
+
+    def _schedule_write(self):
+        """Wake the writer thread, starting it if needed; caller holds _lock"""
+        now = time.monotonic()
+        if not self._save_pending:
+            self._save_pending = True
+            self._first_change = now
+        self._last_change = now
+        self._changed.notify()
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name='DataManagerWriter', daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                while not self._save_pending:
+                    self._changed.wait()
+                # Wait for the changes to settle, but not forever
+                while self._save_pending:
+                    now = time.monotonic()
+                    deadline = min(self._last_change + SAVE_DELAY, self._first_change + MAX_SAVE_DELAY)
+                    if now >= deadline:
+                        break
+                    self._changed.wait(deadline - now)
+                if not self._save_pending:
+                    continue
+                self._save_pending = False
+            self._write_pending()
+
+    @traced('DataManager.write', 'io')
+    def _write_pending(self):
+        """Store queued events, then a full save if one is needed
+
+        The snapshot is only taken once the queue is empty, so it never
+        includes an event the backend has not stored yet.
+        """
+        with self._write_lock:
+            while True:
+                with self._lock:
+                    events, self._events = self._events, []
+                    if not events:
+                        if not self._dirty:
+                            return
+                        self._dirty = False
+                        snapshot = self.storage.serialize(self.data)
+                        break
+                try:
+                    stored = self.storage.append(events)
+                except Exception as e:
+                    Logger.error(f"DataManager: Error storing changes: {e}")
+                    stored = False
+                if not stored or self.storage.needs_save():
+                    with self._lock:
+                        self._dirty = True
+            try:
+                self.storage.save(snapshot)
+                Logger.info(f"DataManager: Data saved successfully")
+            except Exception as e:
+                Logger.error(f"DataManager: Error saving data: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    @traced('DataManager.save_data', 'io')
     def save_data(self):
-        try:
-            data_dir = os.path.dirname(self.data_file)
-            if data_dir and not os.path.exists(data_dir):
-                os.makedirs(data_dir)
-            with open(self.data_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
-            Logger.info(f"DataManager: Data saved successfully. DataManager: Saved to {self.data_file}")
-        except Exception as e:
-            Logger.error(f"DataManager: Error saving data: {e}")
+        """Write the whole data now, on the calling thread"""
+        with self._lock:
+            self._dirty = True
+        self._write_pending()
+
+    def flush(self):
+        """Write pending changes now, if there are any"""
+        self._write_pending()
 
     # Score & Points
     def get_best_score(self):
         return self.data.get('best_score', 0)
 
     def set_best_score(self, score):
-        self.data['best_score'] = max(score, self.get_best_score())
-        self.save_data()
+        if score > self.get_best_score():
+            self.record({'type': 'best_score', 'score': score})
 
     def get_total_points(self):
         return self.data.get('total_points', 0)
 
     def add_points(self, points):
-        self.data['total_points'] = self.get_total_points() + points
-        self.save_data()
+        self.record({'type': 'points', 'amount': points})
+
+    def record_run(self, score, points):
+        """Store a finished run; updates best score and total points"""
+        self.record({'type': 'run', 'score': score, 'points': points, 'time': time.time()})
+
+    def get_run_history(self, limit=20):
+        """Latest runs first (empty with the JSON backend)"""
+        return self.storage.recent_runs(limit)
 
     # Settings
     def get_setting(self, key, default=None):
         return self.data.get('settings', {}).get(key, default)
 
     def set_setting(self, key, value):
-        self.data.setdefault('settings', {})[key] = value
-        self.save_data()
+        self.record({'type': 'setting', 'key': key, 'value': value})
 
     def get_sound_enabled(self):
         return self.get_setting('sound_enabled', True)
@@ -114,48 +277,27 @@ class DataManager:
 
     # Shop & Purchase
     def get_shop_items(self):
-        """Return a static list of shop items"""
-        items = []
-        # Skins bo_0 to bo_19
-        for i in range(20):
-            items.append({
-                "id": f"bo_{i}",
-                "name": f"Bo {i}",
-                "cost": 50 + i * 10,
-                "type": "skin"
-            })
-
-        # Backgrounds background_1 to background_10
-        for i in range(1, 11):
-            items.append({
-                "id": f"background_{i}",
-                "name": f"Background {i}",
-                "cost": 100 + i * 20,
-                "type": "background"
-            })
-
-        return items
+        """Return the shop items (read-only)"""
+        return self.catalog.items
 
     def get_purchased_items(self):
         return self.data.get('purchased_items', [])
 
     def has_purchased(self, item_id):
-        return item_id in self.get_purchased_items()
+        return item_id in self.owned_items
 
     def purchase_item(self, item_id):
         if self.has_purchased(item_id):
             Logger.info(f"DataManager: Item '{item_id}' already purchased.")
             return False
 
-        item = next((i for i in self.shop_items if i['id'] == item_id), None)
+        item = self.catalog.get(item_id)
         if not item:
             Logger.warning(f"DataManager: Item '{item_id}' not found in shop.")
             return False
 
         if self.get_total_points() >= item['cost']:
-            self.data['total_points'] -= item['cost']
-            self.data.setdefault('purchased_items', []).append(item_id)
-            self.save_data()
+            self.record({'type': 'purchase', 'item': item_id, 'cost': item['cost']})
             Logger.info(f"DataManager: Purchased item '{item_id}' successfully.")
             return True
         else:
@@ -163,31 +305,27 @@ class DataManager:
             return False
 
     def get_purchased_skins(self):
-        return [item_id for item_id in self.get_purchased_items()
-                if any(i['id'] == item_id and i['type'] == 'skin' for i in self.shop_items)]
+        return [item_id for item_id in self.get_purchased_items() if self.catalog.type_of(item_id) == 'skin']
 
     def get_purchased_backgrounds(self):
-        return [item_id for item_id in self.get_purchased_items()
-                if any(i['id'] == item_id and i['type'] == 'background' for i in self.shop_items)]
+        return [item_id for item_id in self.get_purchased_items() if self.catalog.type_of(item_id) == 'background']
 
     # Equipped Items
     def get_equipped_skin(self):
         return self.data.get('equipped_skin', None)
 
     def set_equipped_skin(self, item_id):
-        self.data['equipped_skin'] = item_id
-        self.save_data()
+        self.record({'type': 'equip', 'slot': 'skin', 'item': item_id})
 
     def get_equipped_background(self):
         return self.data.get('equipped_background', None)
 
     def set_equipped_background(self, item_id):
-        self.data['equipped_background'] = item_id
-        self.save_data()
+        self.record({'type': 'equip', 'slot': 'background', 'item': item_id})
 
     def get_item_by_id(self, item_id):
         """Return item dict by ID"""
-        return next((item for item in self.shop_items if item['id'] == item_id), None)
+        return self.catalog.get(item_id)
     
     def get_music_enabled(self):
         return self.data.get("settings", {}).get("music_enabled", True)
@@ -0,0 +1,53 @@
+"""
+Entity Pool for When Cows Fly
+Recycles obstacles and collectibles instead of constructing new ones
+"""
+
+
+class EntityPool:
+    """Free lists of reusable objects, grouped by key (e.g. obstacle type)
+
+    New objects are made with factory(*args). Pooled objects must have a
+    reset(*args) method taking the same arguments, which is called when
+    they are handed out again.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = {}
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+
+    def preallocate(self, key, count, *args):
+        """Fill the free list for key up to count objects"""
+        free = self.free.setdefault(key, [])
+        while len(free) < count:
+            free.append(self.factory(*args))
+
+    def acquire(self, key, *args):
+        """Get a reset object for key, constructing one only if none is free"""
+        free = self.free.get(key)
+        if free:
+            self.hits += 1
+            obj = free.pop()
+            obj.reset(*args)
+            return obj
+        self.misses += 1
+        return self.factory(*args)
+
+    def release(self, key, obj):
+        """Give an object back to the pool"""
+        self.free.setdefault(key, []).append(obj)
+        self.released += 1
+
+    def stats(self):
+        """Pool hit/miss counters and free objects per key"""
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'released': self.released,
+            'free': {key: len(free) for key, free in self.free.items()},
+        }
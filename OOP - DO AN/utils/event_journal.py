@@ -0,0 +1,122 @@
+"""
+Event Journal for When Cows Fly
+Append-only log of small game data changes, one JSON object per line.
+
+Each event carries a sequence number. The main save file records the last
+sequence number it includes, so after a crash the events past it are
+replayed on top of it; compact() then drops the events the save already
+covers.
+"""
+
+import json
+import os
+import threading
+
+from kivy.logger import Logger
+
+
+class EventJournal:
+    """Appends numbered events to a JSON-lines file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0
+        # Events appended since the last compaction
+        self.pending = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def replay(self, after_seq):
+        """Read back the events newer than after_seq, oldest first
+
+        A line torn by a crash mid-append is cut off so later appends
+        start on a clean line.
+        """
+        events = []
+        with self._lock:
+            self.seq = after_seq
+            self.pending = 0
+            if not os.path.exists(self.path):
+                return events
+            with open(self.path, 'rb+') as f:
+                valid_end = 0
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_end += len(line)
+                    self.pending += 1
+                    if event['seq'] > after_seq:
+                        events.append(event)
+                        self.seq = event['seq']
+                if os.path.getsize(self.path) != valid_end:
+                    Logger.warning(f"EventJournal: Dropping torn tail of {self.path}")
+                    f.truncate(valid_end)
+        return events
+
+    def append(self, events):
+        """Number the events and append them durably with one write and fsync
+
+        Returns False if they were not written. Called with a whole batch,
+        off the main thread, so the fsync is paid once per batch.
+        """
+        with self._lock:
+            lines = []
+            for event in events:
+                self.seq += 1
+                event['seq'] = self.seq
+                lines.append(json.dumps(event, separators=(',', ':')) + '\n')
+            try:
+                if self._file is None:
+                    self._file = open(self.path, 'a')
+                self._file.write(''.join(lines))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except Exception as e:
+                Logger.error(f"EventJournal: Error appending events: {e}")
+                return False
+            self.pending += len(events)
+            return True
+
+    def compact(self, upto_seq):
+        """Drop events up to upto_seq, which the save file now holds"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            kept = []
+            dropped = 0
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, 'r') as f:
+                        for line in f:
+                            if not line.endswith('\n'):
+                                continue
+                            try:
+                                seq = json.loads(line)['seq']
+                            except (ValueError, KeyError, TypeError):
+                                # A corrupt line must not stop the journal from shrinking
+                                dropped += 1
+                                continue
+                            if seq > upto_seq:
+                                kept.append(line)
+                if dropped:
+                    Logger.warning(f"EventJournal: Dropped {dropped} unreadable lines from {self.path}")
+                temp_file = self.path + '.tmp'
+                with open(temp_file, 'w') as f:
+                    f.writelines(kept)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.path)
+                self.pending = len(kept)
+            except Exception as e:
+                Logger.error(f"EventJournal: Error compacting journal: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
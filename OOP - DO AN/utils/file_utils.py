@@ -0,0 +1,19 @@
+"""
+File Utilities for When Cows Fly
+Small filesystem helpers shared by the modules that write files.
+"""
+
+import os
+
+
+def ensure_dir(directory):
+    """Create directory (and its parents) if it does not exist yet"""
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def ensure_parent_dir(path):
+    """Create the directory path will be written into; returns path"""
+    ensure_dir(os.path.dirname(path))
+    return path
@@ -0,0 +1,94 @@
+"""
+Frame Profiler for When Cows Fly
+Ring buffer of per-frame timings split into game loop phases
+"""
+
+import json
+import time
+from collections import deque
+
+from utils.file_utils import ensure_parent_dir
+
+# Frame-time histogram bucket upper edges in milliseconds
+HISTOGRAM_EDGES_MS = (8, 17, 25, 33, 50, 100)
+
+
+class FrameProfiler:
+    """Records frame time, per-phase time and entity counts for the last frames
+
+    Callers hold it as an optional attribute (None when profiling is off),
+    so a disabled profiler costs one attribute check per phase. Within a
+    frame, mark(phase) adds the time since the previous mark to that phase;
+    phases marked on several fixed steps in one frame add up.
+    """
+
+    def __init__(self, capacity=300):
+        self.frames = deque(maxlen=capacity)
+        self.clock = time.perf_counter
+        self.current = None
+        self.last_mark = 0.0
+
+    def begin_frame(self, frame_dt):
+        self.current = {'dt': frame_dt, 'phases': {}}
+        self.last_mark = self.clock()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase"""
+        now = self.clock()
+        phases = self.current['phases']
+        phases[phase] = phases.get(phase, 0.0) + now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self, counts=None):
+        self.current['counts'] = counts or {}
+        self.frames.append(self.current)
+        self.current = None
+
+    def frame_times(self):
+        return [frame['dt'] for frame in self.frames]
+
+    def stats(self):
+        """FPS, frame-time percentiles, histogram and mean phase times in ms"""
+        times = sorted(self.frame_times())
+        if not times:
+            return None
+        count = len(times)
+        mean = sum(times) / count
+
+        histogram = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+        for dt in times:
+            ms = dt * 1000
+            for i, edge in enumerate(HISTOGRAM_EDGES_MS):
+                if ms <= edge:
+                    histogram[i] += 1
+                    break
+            else:
+                histogram[-1] += 1
+
+        phase_totals = {}
+        for frame in self.frames:
+            for phase, seconds in frame['phases'].items():
+                phase_totals[phase] = phase_totals.get(phase, 0.0) + seconds
+
+        return {
+            'frames': count,
+            'fps': 1.0 / mean if mean else 0.0,
+            'mean_ms': mean * 1000,
+            'p50_ms': times[count // 2] * 1000,
+            'p99_ms': times[min(count - 1, int(count * 0.99))] * 1000,
+            'max_ms': times[-1] * 1000,
+            'histogram': histogram,
+            'phases_ms': {phase: total * 1000 / count for phase, total in phase_totals.items()},
+            'counts': self.frames[-1].get('counts', {}),
+        }
+
+    def dump(self, path):
+        """Write the ring buffer and its summary to a JSON file"""
+        ensure_parent_dir(path)
+        with open(path, 'w') as f:
+            json.dump({
+                'histogram_edges_ms': HISTOGRAM_EDGES_MS,
+                'summary': self.stats(),
+                'frames': list(self.frames),
+            }, f)
+        return path
@@ -0,0 +1,82 @@
+"""
+Game Loop for When Cows Fly
+Fixed-timestep driver for the GameWorld simulation
+"""
+
+DEFAULT_TICK_RATE = 60
+DEFAULT_MAX_STEPS = 5
+
+
+class FixedStepLoop:
+    """Turns variable frame times into fixed-size world steps
+
+    Frame time is accumulated and consumed in steps of 1 / tick_rate, so a
+    long frame runs several small steps instead of one huge one. At most
+    max_steps run per frame; any time beyond that is dropped so a slow
+    device cannot fall further and further behind. After advance(), alpha
+    is how far the display is between the last two steps, for interpolated
+    rendering.
+
+    If a recorder is set, every input is passed to recorder.record(tick,
+    action) with the tick it was applied on, which is what a replay needs.
+    """
+
+    def __init__(self, world, tick_rate=DEFAULT_TICK_RATE, max_steps=DEFAULT_MAX_STEPS):
+        self.world = world
+        self.tick_rate = tick_rate
+        self.step_dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.tick = 0
+        self.dropped_time = 0.0
+        self.pending_inputs = []
+        self.recorder = None
+
+    @property
+    def alpha(self):
+        """Interpolation factor between the previous and current step"""
+        return self.accumulator / self.step_dt
+
+    def reset(self):
+        """Forget accumulated time, e.g. after a pause"""
+        self.accumulator = 0.0
+        self.pending_inputs = []
+
+    def restart(self):
+        """Reset for a new run, counting ticks from zero again"""
+        self.reset()
+        self.tick = 0
+        self.dropped_time = 0.0
+
+    def push_input(self, action):
+        """Queue an input for the next world step"""
+        self.pending_inputs.append(action)
+
+    def advance(self, frame_dt):
+        """Run as many fixed steps as frame_dt covers; returns their events"""
+        self.accumulator += frame_dt
+        events = []
+        steps = 0
+        while self.accumulator >= self.step_dt:
+            if steps >= self.max_steps:
+                # Spiral-of-death guard: drop the backlog
+                self.dropped_time += self.accumulator - self.accumulator % self.step_dt
+                self.accumulator %= self.step_dt
+                break
+            events.extend(self.run_tick())
+            self.accumulator -= self.step_dt
+            steps += 1
+            if self.world.is_over:
+                self.accumulator = 0.0
+                break
+        return events
+
+    def run_tick(self):
+        """Run exactly one world step with the queued inputs"""
+        inputs, self.pending_inputs = self.pending_inputs, []
+        if self.recorder is not None:
+            for action in inputs:
+                self.recorder.record(self.tick, action)
+        events = self.world.step(self.step_dt, inputs)
+        self.tick += 1
+        return events
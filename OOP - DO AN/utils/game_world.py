@@ -0,0 +1,567 @@
+"""
+Game World for When Cows Fly
+Pure-Python simulation of the cow, obstacles, collectibles, score and lives.
+Nothing in here touches Kivy, so the game can be stepped without a window.
+"""
+
+import random
+from bisect import insort
+from operator import attrgetter
+
+from utils.entity_pool import EntityPool
+from utils.broadphase import SweepIndex
+from utils.tracer import traced
+
+GRAVITY = 600
+JUMP_STRENGTH = 400
+GROUND_LEVEL = 150  # Raised ground level to make it more difficult
+
+COW_START_X = 100
+COW_SIZE = (150, 150)
+START_LIVES = 3
+HIT_LIFE_DELAY = 0.5
+
+OBSTACLE_TYPES = ['hole', 'kite', 'kite', 'kite', 'barrier', 'bird', 'electric_wire']
+
+_left_edge = attrgetter('x')
+
+# Swarm mode: extra kites and birds per second, kept in a SwarmStore
+SWARM_SPAWN_RATE = 200
+SWARM_TYPES = ['kite', 'bird']
+
+# Entities created up front so spawning mid-run reuses them
+OBSTACLE_POOL_SIZE = 4
+COLLECTIBLE_POOL_SIZE = 6
+
+
+class Entity:
+    """Axis-aligned box with the same geometry helpers as a Kivy widget"""
+
+    def __init__(self, x=0, y=0, width=0, height=0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.prev_x = x
+        self.prev_y = y
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def top(self):
+        return self.y + self.height
+
+    @property
+    def center_x(self):
+        return self.x + self.width / 2
+
+    @property
+    def center_y(self):
+        return self.y + self.height / 2
+
+    @property
+    def pos(self):
+        return (self.x, self.y)
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def save_position(self):
+        """Remember the current position as the previous step's position"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def lerp_pos(self, alpha):
+        """Position interpolated between the previous and current step"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def collide(self, other):
+        """Same inclusive box test as Widget.collide_widget"""
+        if self.right < other.x:
+            return False
+        if self.x > other.right:
+            return False
+        if self.top < other.y:
+            return False
+        if self.y > other.top:
+            return False
+        return True
+
+
+class CowState(Entity):
+    """Cow physics: gravity, jumping, falling into holes and hit flashing"""
+
+    def __init__(self):
+        super().__init__(COW_START_X, GROUND_LEVEL, *COW_SIZE)
+        self.velocity_y = 0
+        self.gravity = GRAVITY
+        self.jump_strength = JUMP_STRENGTH
+        self.ground_level = GROUND_LEVEL
+        self.is_falling = False
+        self.fall_reason = None
+        self.game_started = False
+
+        # Flashing effect properties
+        self.is_flashing = False
+        self.flash_timer = 0
+        self.flash_duration = 1.0
+        self.flash_interval = 0.1
+
+    @property
+    def opacity(self):
+        """Opacity the renderer should draw the cow with"""
+        if not self.is_flashing:
+            return 1.0
+        flash_cycle = int(self.flash_timer / self.flash_interval)
+        return 0.3 if flash_cycle % 2 == 0 else 1.0
+
+    @traced('Cow.update')
+    def update(self, dt, world):
+        if not self.game_started:
+            return
+
+        # Handle flashing effect
+        if self.is_flashing:
+            self.flash_timer += dt
+            if self.flash_timer >= self.flash_duration:
+                self.is_flashing = False
+                self.flash_timer = 0
+
+        self.velocity_y -= self.gravity * dt
+        self.y += self.velocity_y * dt
+
+        if self.is_falling and self.fall_reason == 'hole' and world.is_cow_in_hole():
+            if self.top >= 0:
+                self.x -= 200 * dt
+            if self.top < 0 and world.is_cow_pass_hole():
+                world.lose_life()
+        else:
+            if self.y <= self.ground_level:
+                self.y = self.ground_level
+                self.velocity_y = 0
+
+    def jump(self):
+        if not self.game_started:
+            self.game_started = True
+
+        if not self.is_falling:
+            self.velocity_y = self.jump_strength
+
+    def start_falling(self, reason='hit'):
+        self.is_falling = True
+        self.fall_reason = reason
+        if reason == 'hole':
+            self.velocity_y = -300
+
+        # Start flashing effect when hit
+        if reason != 'hole':
+            self.start_flashing()
+
+    def start_flashing(self):
+        """Start the flashing effect"""
+        self.is_flashing = True
+        self.flash_timer = 0
+
+    def reset_to_ground(self):
+        self.x = COW_START_X
+        self.y = self.ground_level
+        self.velocity_y = 0
+        self.is_falling = False
+        self.fall_reason = None
+        self.is_flashing = False
+        self.flash_timer = 0
+        self.save_position()
+
+
+class ObstacleState(Entity):
+    """Obstacle with the special behaviors of each obstacle type"""
+
+    def __init__(self, obstacle_type, world_width, world_height, rng=random):
+        super().__init__()
+        self.reset(obstacle_type, world_width, world_height, rng)
+
+    def reset(self, obstacle_type, world_width, world_height, rng=random):
+        """(Re)initialize as a freshly spawned obstacle"""
+        self.obstacle_type = obstacle_type
+        self.speed = 200
+
+        # Special physics for different obstacles
+        self.velocity_y = 0
+        self.gravity = 0
+        self.rotation_speed = 0
+        self.horizontal_drift = 0
+
+        if obstacle_type == 'electric_wire':
+            self.width, self.height = world_width, 20
+            self.x, self.y = 0, world_height - 20
+        elif obstacle_type == 'hole':
+            self.width, self.height = 80, GROUND_LEVEL
+            self.x, self.y = world_width, 0
+        elif obstacle_type == 'barrier':
+            self.width, self.height = 20, rng.randint(80, 140)
+            self.x, self.y = world_width, GROUND_LEVEL
+        elif obstacle_type == 'kite':
+            self.width, self.height = 30, 40
+            # Kites start from higher up and to the right, falling diagonally
+            start_x = world_width * rng.uniform(0.4, 0.7)
+            start_y = world_height - rng.randint(50, 100)
+            self.x, self.y = start_x, start_y
+            if start_x < 0.6:
+                self.gravity = 700
+            else:
+                self.gravity = 200 * rng.uniform(0.8, 1)  # Reduced gravity for more controlled fall
+            self.rotation_speed = rng.uniform(180, 360)
+            # Leftward drift while falling
+            self.horizontal_drift = rng.uniform(50, 100)
+        elif obstacle_type == 'bird':
+            self.width, self.height = 35, 25
+            self.x, self.y = world_width, rng.randint(GROUND_LEVEL + 40, world_height - 80)
+            self.speed = 2000  # Faster bird speed
+
+        self.initial_y = self.y
+        self.rotation_angle = 0
+        self.save_position()
+
+    def update(self, dt, speed_multiplier=1.0):
+        """Move the obstacle; returns True once it has left the screen"""
+        if self.obstacle_type == 'electric_wire':
+            return False
+
+        self.x -= self.speed * speed_multiplier * dt
+
+        if self.obstacle_type == 'kite':
+            self.velocity_y -= self.gravity * dt
+            self.velocity_y = max(self.velocity_y, -100)  # limit fall speed
+            self.y += self.velocity_y * dt
+            self.rotation_angle += self.rotation_speed * dt
+            self.x -= self.horizontal_drift * dt
+        elif self.obstacle_type == 'bird':
+            self.rotation_angle += 120 * dt  # Wing flapping animation
+
+        return self.x < -self.width
+
+
+class CollectibleState(Entity):
+    """Grass item the cow collects for points"""
+
+    def __init__(self, world_width, world_height, rng=random):
+        super().__init__(0, 0, 25, 25)
+        self.reset(world_width, world_height, rng)
+
+    def reset(self, world_width, world_height, rng=random):
+        """(Re)initialize as a freshly spawned collectible"""
+        self.x = world_width
+        self.y = rng.randint(GROUND_LEVEL + 30, world_height - 80)
+        self.speed = 200
+        self.pulse_timer = 0
+        self.save_position()
+
+    def update(self, dt, speed_multiplier=1.0):
+        """Move the collectible; returns True once it has left the screen"""
+        self.pulse_timer += dt
+        self.x -= self.speed * speed_multiplier * dt
+        return self.x < -self.width
+
+
+class GameWorld:
+    """Whole game state, advanced with step(dt, inputs)
+
+    step() returns the events of that step as (kind, payload) tuples so the
+    screen can add/remove widgets and play sounds:
+    spawn_obstacle, despawn_obstacle, spawn_collectible, despawn_collectible,
+    hit, collect, life_lost and game_over (payload is the reason).
+
+    With swarm mode on, self.swarm holds an array-backed SwarmStore of extra
+    kites and birds; a swarm hit has None as its payload.
+    """
+
+    def __init__(self, width, height, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = random.Random()
+        self.obstacle_pool = EntityPool(ObstacleState)
+        self.collectible_pool = EntityPool(CollectibleState)
+        for obstacle_type in sorted(set(OBSTACLE_TYPES)):
+            self.obstacle_pool.preallocate(obstacle_type, OBSTACLE_POOL_SIZE,
+                                            obstacle_type, width, height, self.rng)
+        self.collectible_pool.preallocate('grass', COLLECTIBLE_POOL_SIZE, width, height, self.rng)
+        self.obstacles = []
+        self.collectibles = []
+        self.obstacle_index = SweepIndex()
+        self.collectible_index = SweepIndex()
+        self.swarm = None
+        # Optional FrameProfiler; step() marks its phases when set
+        self.profiler = None
+        self.reset(seed=seed)
+
+    def set_swarm(self, enabled, spawn_rate=SWARM_SPAWN_RATE):
+        """Turn swarm mode on or off; needs numpy"""
+        if enabled:
+            from utils.swarm_store import SwarmStore
+            if self.swarm is None:
+                self.swarm = SwarmStore()
+            self.swarm_spawn_rate = spawn_rate
+        else:
+            self.swarm = None
+
+    def reset(self, width=None, height=None, seed=None):
+        """Start a fresh run; the same seed and inputs replay the same run"""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng.seed(seed)
+        if width is not None:
+            self.width = width
+        if height is not None:
+            self.height = height
+        self.cow = CowState()
+        for obstacle in self.obstacles:
+            self.obstacle_pool.release(obstacle.obstacle_type, obstacle)
+        for collectible in self.collectibles:
+            self.collectible_pool.release('grass', collectible)
+        self.obstacles = []
+        self.collectibles = []
+        # Holes sorted by x; they all scroll at the same speed so the order holds
+        self.holes = []
+        self.score = 0
+        self.lives = START_LIVES
+        self.speed_multiplier = 1.0
+        self.spawn_timer = 0
+        self.collectible_spawn_timer = 0
+        self.pending_life_losses = []
+        self.swarm_spawn_timer = 0
+        if self.swarm is not None:
+            self.swarm.clear()
+        self.is_over = False
+        self.events = []
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    def entity_counts(self):
+        """Live entity counts, e.g. for the profiler overlay"""
+        return {
+            'obstacles': len(self.obstacles),
+            'collectibles': len(self.collectibles),
+            'swarm': self.swarm.count if self.swarm is not None else 0,
+        }
+
+    def pool_stats(self):
+        """Hit/miss statistics of the obstacle and collectible pools"""
+        return {
+            'obstacles': self.obstacle_pool.stats(),
+            'collectibles': self.collectible_pool.stats(),
+        }
+
+    def step(self, dt, inputs=()):
+        """Advance the world by dt seconds and return this step's events"""
+        self.events = []
+        if self.is_over:
+            return self.events
+
+        self.save_positions()
+
+        for action in inputs:
+            if action == 'jump':
+                self.cow.jump()
+
+        self.update_life_timers(dt)
+        if self.is_over:
+            return self.events
+
+        self.cow.update(dt, self)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.mark('cow')
+
+        # Only spawn obstacles and update game elements after cow starts moving
+        if self.is_over or not self.cow.game_started:
+            return self.events
+
+        # Update speed based on score
+        self.speed_multiplier = 1.0 + (self.score // 30) * 0.3
+
+        self.spawn_timer += dt
+        spawn_interval = 3.5 / self.speed_multiplier
+        if self.spawn_timer >= spawn_interval:
+            self.spawn_obstacle()
+            self.spawn_timer = 0
+
+        self.collectible_spawn_timer += dt
+        collectible_interval = 2.0
+        if self.collectible_spawn_timer >= collectible_interval:
+            # Sometimes spawn multiple collectibles
+            num_collectibles = self.rng.choices([1, 2, 3], weights=[60, 30, 10])[0]
+            for _ in range(num_collectibles):
+                self.spawn_collectible()
+            self.collectible_spawn_timer = 0
+        if profiler is not None:
+            profiler.mark('spawn')
+
+        for obstacle in self.obstacles[:]:
+            if obstacle.update(dt, self.speed_multiplier):
+                self.remove_obstacle(obstacle)
+        if profiler is not None:
+            profiler.mark('obstacles')
+
+        for collectible in self.collectibles[:]:
+            if collectible.update(dt, self.speed_multiplier):
+                self.remove_collectible(collectible)
+        if profiler is not None:
+            profiler.mark('collectibles')
+
+        if self.swarm is not None:
+            self.update_swarm(dt)
+            if profiler is not None:
+                profiler.mark('swarm')
+
+        # Only entities overlapping the cow's x-range get a box test
+        cow = self.cow
+        self.obstacle_index.rebuild(self.obstacles)
+        for obstacle in self.obstacle_index.query(cow.x, cow.right):
+            self.check_collision(obstacle)
+            if self.is_over:
+                return self.events
+
+        self.collectible_index.rebuild(self.collectibles)
+        for collectible in self.collectible_index.query(cow.x, cow.right):
+            self.check_collectible_collision(collectible)
+        if profiler is not None:
+            profiler.mark('collision')
+
+        return self.events
+
+    def update_swarm(self, dt):
+        """Spawn, move and collide the swarm in whole-array passes"""
+        self.swarm_spawn_timer += dt
+        interval = 1.0 / self.swarm_spawn_rate
+        while self.swarm_spawn_timer >= interval:
+            self.swarm.spawn(self.rng.choice(SWARM_TYPES), self.width, self.height, self.rng)
+            self.swarm_spawn_timer -= interval
+
+        self.swarm.step(dt, self.speed_multiplier)
+
+        cow = self.cow
+        hits = self.swarm.overlapping(cow.x, cow.y, cow.right, cow.top)
+        if self.swarm.remove(hits) and not cow.is_falling:
+            # However many birds it flew into, the cow only takes one hit
+            self.events.append(('hit', None))
+            cow.start_falling('hit')
+            self.pending_life_losses.append(HIT_LIFE_DELAY)
+
+    def save_positions(self):
+        """Snapshot positions so the renderer can interpolate this step"""
+        self.cow.save_position()
+        for obstacle in self.obstacles:
+            obstacle.save_position()
+        for collectible in self.collectibles:
+            collectible.save_position()
+
+    def update_life_timers(self, dt):
+        """Count down the delayed life losses queued by hits"""
+        if not self.pending_life_losses:
+            return
+        remaining = []
+        due = 0
+        for timer in self.pending_life_losses:
+            timer -= dt
+            if timer <= 0:
+                due += 1
+            else:
+                remaining.append(timer)
+        self.pending_life_losses = remaining
+        for _ in range(due):
+            self.lose_life()
+            if self.is_over:
+                return
+
+    @traced()
+    def spawn_obstacle(self, obstacle_type=None):
+        """Spawn a random obstacle"""
+        if obstacle_type is None:
+            obstacle_type = self.rng.choice(OBSTACLE_TYPES)
+        obstacle = self.obstacle_pool.acquire(obstacle_type, obstacle_type, self.width, self.height, self.rng)
+        self.obstacles.append(obstacle)
+        if obstacle_type == 'hole':
+            insort(self.holes, obstacle, key=_left_edge)
+        self.events.append(('spawn_obstacle', obstacle))
+        return obstacle
+
+    def spawn_collectible(self):
+        """Spawn a collectible grass"""
+        collectible = self.collectible_pool.acquire('grass', self.width, self.height, self.rng)
+        self.collectibles.append(collectible)
+        self.events.append(('spawn_collectible', collectible))
+        return collectible
+
+    def remove_obstacle(self, obstacle):
+        self.obstacles.remove(obstacle)
+        if obstacle.obstacle_type == 'hole':
+            self.holes.remove(obstacle)
+        self.obstacle_pool.release(obstacle.obstacle_type, obstacle)
+        self.events.append(('despawn_obstacle', obstacle))
+
+    def remove_collectible(self, collectible):
+        self.collectibles.remove(collectible)
+        self.collectible_pool.release('grass', collectible)
+        self.events.append(('despawn_collectible', collectible))
+
+    @traced()
+    def check_collision(self, obstacle):
+        """Check collision between cow and obstacle"""
+        if not self.cow.collide(obstacle):
+            return
+        self.cow.start_falling(obstacle.obstacle_type)
+
+        if obstacle.obstacle_type == 'electric_wire':
+            # Instant game over for electric wire
+            self.end_game('electric_wire')
+        elif obstacle.obstacle_type == 'hole':
+            # Hole falls are resolved by the cow physics
+            pass
+        else:
+            # Other obstacles cause cow to fall and lose life
+            self.events.append(('hit', obstacle))
+            self.cow.start_falling('hit')
+            self.remove_obstacle(obstacle)
+            self.pending_life_losses.append(HIT_LIFE_DELAY)
+
+    def check_collectible_collision(self, collectible):
+        """Check collision between cow and collectible"""
+        if self.cow.collide(collectible):
+            self.score += 1
+            self.events.append(('collect', collectible))
+            self.remove_collectible(collectible)
+
+    def lose_life(self):
+        """Lose a life and put the cow back on the ground"""
+        self.lives -= 1
+        self.cow.reset_to_ground()
+        self.events.append(('life_lost', self.lives))
+        if self.lives <= 0:
+            self.end_game('lives')
+
+    def end_game(self, reason):
+        if not self.is_over:
+            self.is_over = True
+            self.events.append(('game_over', reason))
+
+    def is_cow_in_hole(self):
+        """Check if cow is positioned over a hole
+
+        Holes share one width, so if any hole's center is left of the cow's
+        center the leftmost one's is.
+        """
+        if not self.holes:
+            return False
+        hole = self.holes[0]
+        return self.cow.center_x >= (hole.x + hole.right) / 2
+
+    def is_cow_pass_hole(self):
+        """Check if the hole the cow fell into has scrolled past it"""
+        return bool(self.holes) and self.holes[0].right <= COW_START_X * 0.8
@@ -0,0 +1,74 @@
+"""
+Preloader for When Cows Fly
+Runs startup loading tasks on worker threads. Each task's result is
+handed to its finish callback on the main thread, where textures can be
+created and widgets touched.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+from utils.tracer import tracer
+
+PRELOAD_WORKERS = 2
+
+
+class Preloader:
+    """Loads assets in the background and reports progress"""
+
+    def __init__(self, workers=PRELOAD_WORKERS):
+        self.workers = workers
+        self.tasks = []
+        self.running = []
+        self.done = 0
+        self.executor = None
+        self.on_progress = None
+        self.on_complete = None
+
+    def add(self, name, work, finish=None):
+        """work() runs on a worker thread; finish(result) then runs on the main thread"""
+        self.tasks.append((name, work, finish))
+
+    def start(self, on_progress=None, on_complete=None):
+        self.on_progress = on_progress
+        self.on_complete = on_complete
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='Preloader')
+        self.running = [(name, self.executor.submit(self.run_task, name, work), finish)
+                        for name, work, finish in self.tasks]
+        Clock.schedule_interval(self.poll, 0)
+
+    def run_task(self, name, work):
+        with tracer.span(f'preload {name}', 'io'):
+            return work()
+
+    @property
+    def total(self):
+        return len(self.tasks)
+
+    def poll(self, dt):
+        """Finish completed tasks on the main thread; stops once all are done"""
+        still_running = []
+        for name, future, finish in self.running:
+            if not future.done():
+                still_running.append((name, future, finish))
+                continue
+            try:
+                result = future.result()
+                if finish:
+                    finish(result)
+            except Exception as e:
+                Logger.warning(f"Preloader: Could not load {name}: {e}")
+            self.done += 1
+            if self.on_progress:
+                self.on_progress(self.done, self.total, name)
+        self.running = still_running
+
+        if self.running:
+            return True
+        self.executor.shutdown(wait=False)
+        Logger.info(f"Preloader: Loaded {self.total} assets")
+        if self.on_complete:
+            self.on_complete()
+        return False
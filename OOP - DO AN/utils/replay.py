@@ -0,0 +1,137 @@
+"""
+Replay for When Cows Fly
+Records a run's seed and inputs per tick, and plays them back through the
+fixed-step loop to reproduce the run exactly.
+
+Replay files are compact JSON:
+    {"version": 1, "seed": 123, "tick_rate": 60, "size": [540, 960],
+     "swarm": false, "inputs": {"jump": [12, 40, 33]},
+     "result": {"ticks": 2017, "score": 9, "lives": 0}}
+Input ticks are stored as deltas from the previous input of that action.
+"""
+
+import json
+import sys
+
+from utils.file_utils import ensure_parent_dir
+from utils.game_world import GameWorld
+from utils.game_loop import FixedStepLoop
+
+REPLAY_VERSION = 1
+
+
+class ReplayRecorder:
+    """Collects (tick, action) inputs for one run"""
+
+    def __init__(self, world, tick_rate):
+        self.seed = world.seed
+        self.tick_rate = tick_rate
+        self.size = (world.width, world.height)
+        self.swarm = world.swarm is not None
+        self.inputs = {}
+        self.result = None
+
+    def record(self, tick, action):
+        self.inputs.setdefault(action, []).append(tick)
+
+    def finish(self, world, ticks):
+        """Store how the run ended so playback can be checked against it"""
+        self.result = {'ticks': ticks, 'score': world.score, 'lives': world.lives}
+
+    def to_dict(self):
+        inputs = {}
+        for action, ticks in self.inputs.items():
+            deltas = []
+            previous = 0
+            for tick in ticks:
+                deltas.append(tick - previous)
+                previous = tick
+            inputs[action] = deltas
+        return {
+            'version': REPLAY_VERSION,
+            'seed': self.seed,
+            'tick_rate': self.tick_rate,
+            'size': list(self.size),
+            'swarm': self.swarm,
+            'inputs': inputs,
+            'result': self.result,
+        }
+
+    def save(self, path):
+        ensure_parent_dir(path)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+
+class Replay:
+    """A loaded replay: seed, world size, tick rate and inputs by tick"""
+
+    def __init__(self, data):
+        if data.get('version') != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version')}")
+        self.seed = data['seed']
+        self.tick_rate = data['tick_rate']
+        self.size = tuple(data['size'])
+        self.swarm = data.get('swarm', False)
+        self.result = data.get('result')
+        self.inputs_by_tick = {}
+        for action, deltas in data['inputs'].items():
+            tick = 0
+            for delta in deltas:
+                tick += delta
+                self.inputs_by_tick.setdefault(tick, []).append(action)
+
+    @property
+    def last_input_tick(self):
+        return max(self.inputs_by_tick, default=0)
+
+
+def load_replay(path):
+    with open(path, 'r') as f:
+        return Replay(json.load(f))
+
+
+class ReplayDriver:
+    """Feeds a replay's inputs back through a FixedStepLoop, tick by tick"""
+
+    def __init__(self, replay, world=None):
+        self.replay = replay
+        self.world = world or GameWorld(*replay.size)
+        self.world.set_swarm(replay.swarm)
+        self.world.reset(*replay.size, seed=replay.seed)
+        self.world.spawn_obstacle('electric_wire')
+        self.loop = FixedStepLoop(self.world, replay.tick_rate)
+
+    def step(self):
+        """Run one tick; returns its events"""
+        for action in self.replay.inputs_by_tick.get(self.loop.tick, ()):
+            self.loop.push_input(action)
+        return self.loop.run_tick()
+
+    def run(self, max_ticks=None):
+        """Play until the run ends (or max_ticks); returns the world"""
+        if max_ticks is None:
+            if self.replay.result:
+                max_ticks = self.replay.result['ticks']
+            else:
+                # Without a recorded end, stop a minute after the last input
+                max_ticks = self.replay.last_input_tick + self.replay.tick_rate * 60
+        while not self.world.is_over and self.loop.tick < max_ticks:
+            self.step()
+        return self.world
+
+    def matches_result(self):
+        """True if the played-back run ended like the recorded one"""
+        result = self.replay.result
+        if not result:
+            return True
+        return (self.loop.tick == result['ticks'] and self.world.score == result['score']
+                and self.world.lives == result['lives'])
+
+
+if __name__ == '__main__':
+    # python -m utils.replay path/to/last_run.json
+    driver = ReplayDriver(load_replay(sys.argv[1]))
+    world = driver.run()
+    print(f"ticks={driver.loop.tick} score={world.score} lives={world.lives} "
+          f"matches_recording={driver.matches_result()}")
@@ -0,0 +1,50 @@
+"""
+Shop Catalog for When Cows Fly
+The items sold in the shop, built once and indexed by id and by type
+"""
+
+from types import MappingProxyType
+
+SKIN_COUNT = 20
+BACKGROUND_COUNT = 10
+
+
+class ShopCatalog:
+    """Read-only list of shop items with lookups by id and by type"""
+
+    def __init__(self, items):
+        self.items = tuple(MappingProxyType(dict(item)) for item in items)
+        self.by_id = MappingProxyType({item['id']: item for item in self.items})
+        by_type = {}
+        for item in self.items:
+            by_type.setdefault(item['type'], []).append(item)
+        self.by_type = MappingProxyType({kind: tuple(items) for kind, items in by_type.items()})
+
+    def get(self, item_id):
+        return self.by_id.get(item_id)
+
+    def of_type(self, item_type):
+        return self.by_type.get(item_type, ())
+
+    def type_of(self, item_id):
+        item = self.by_id.get(item_id)
+        return item['type'] if item else None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, item_id):
+        return item_id in self.by_id
+
+
+def build_catalog():
+    """Skins bo_0..bo_19 cost 5 to 290, backgrounds background_1..10 cost 20 to 290"""
+    items = [{'id': f'bo_{i}', 'name': f'Bo {i}', 'type': 'skin', 'cost': 5 + i * 15,
+              'image': f'assets/images/characters/bo_{i}.png'} for i in range(SKIN_COUNT)]
+    items += [{'id': f'background_{i + 1}', 'name': f'Background {i + 1}', 'type': 'background',
+               'cost': 20 + i * 30, 'image': f'assets/images/backgrounds/background_{i + 1}.png'}
+              for i in range(BACKGROUND_COUNT)]
+    return ShopCatalog(items)
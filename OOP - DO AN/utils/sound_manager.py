@@ -1,20 +1,52 @@
 """
 Sound Manager for When Cows Fly
 Handles loading and playing sound effects
+
+Each effect gets a small pool of preloaded voices so overlapping plays do
+not cut each other off; when every voice is busy the oldest is stolen.
+Plays closer together than an effect's minimum interval are dropped, and
+the sound/music enabled and volume settings are kept in a snapshot
+updated by apply_settings(), set_sound_enabled(), set_music_enabled()
+and set_volume() instead of being looked up on every play.
 """
 
 import os
 import random
+import time
 from kivy.core.audio import SoundLoader
 from kivy.logger import Logger
-from kivy.app import App
+
+from utils.tracer import traced
+
+# Voices preloaded per effect; effects not listed get DEFAULT_VOICES
+SOUND_VOICES = {
+    'fly': 4,
+    'collect': 3,
+    'hit': 2,
+}
+DEFAULT_VOICES = 1
+# Seconds that must pass between two plays of the same effect
+SOUND_MIN_INTERVAL = {
+    'fly': 0.05,
+    'collect': 0.03,
+}
+DEFAULT_MIN_INTERVAL = 0.03
+DEFAULT_VOLUME = 0.8
 
 
 class SoundManager:
     """Manages sound effects for the game"""
     
     def __init__(self):
+        # Effect name -> list of voices (Sound instances of the same file)
         self.sounds = {}
+        # Effect name -> index of the voice to try next
+        self.next_voice = {}
+        # Effect name -> perf_counter time of its last play
+        self.last_played = {}
+        self.sound_enabled = True
+        self.music_enabled = True
+        self.volume = DEFAULT_VOLUME
         self.sound_files = {
             'fly': 'fly.wav',
             'hit': 'hit.wav',
@@ -25,54 +57,97 @@ class SoundManager:
         self.music_tracks = [f'background_{i}.mp3' for i in range(1, 7)]
         self.current_music = None
         self.background_music = None
+        # (file name, sound) loaded ahead for the next play_background_music()
+        self.next_music = None
+
+    @traced('SoundManager.load_background_music', 'audio')
+    def load_background_music(self):
+        """Pick and load a track for the next play; safe on a worker thread"""
+        music_file = random.choice(self.music_tracks)
+        music_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'sounds','background_musics', music_file)
 
+        if not os.path.exists(music_path):
+            Logger.warning(f"SoundManager: Background music file not found: {music_path}")
+            return None
+        music = SoundLoader.load(music_path)
+        if music:
+            music.loop = True
+            self.next_music = (music_file, music)
+        return music
     
+    @traced('SoundManager.play_background_music', 'audio')
     def play_background_music(self):
-        app = App.get_running_app()
-        if app and hasattr(app, 'data_manager'):
-            if not app.data_manager.get_music_enabled():
-                return
+        if not self.music_enabled:
+            return
 
         if self.current_music and self.current_music.state == 'play':
             return  # Already playing
 
-        music_file = random.choice(self.music_tracks)
-        music_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'sounds','background_musics', music_file)
-
-        if os.path.exists(music_path):
-            self.current_music = SoundLoader.load(music_path)
-            if self.current_music:
-                self.current_music.loop = True
-                self.current_music.volume = app.data_manager.get_volume() if app else 0.8
-                self.current_music.play()
-                Logger.info(f"SoundManager: Playing background music: {music_file}")
-        else:
-            Logger.warning(f"SoundManager: Background music file not found: {music_path}")
+        if self.next_music is None:
+            self.load_background_music()
+        if self.next_music:
+            music_file, self.current_music = self.next_music
+            self.next_music = None
+            self.current_music.volume = self.volume
+            self.current_music.play()
+            Logger.info(f"SoundManager: Playing background music: {music_file}")
 
     def stop_background_music(self):
         if self.current_music:
             self.current_music.stop()
             self.current_music = None
 
+    def apply_settings(self, data_manager):
+        """Refresh the enabled/volume snapshot from saved settings"""
+        self.set_sound_enabled(data_manager.get_sound_enabled())
+        self.music_enabled = data_manager.get_music_enabled()
+        self.set_volume(data_manager.get_volume())
+
+    def set_music_enabled(self, enabled):
+        """Turn background music on or off, starting or stopping it"""
+        self.music_enabled = enabled
+        if enabled:
+            self.play_background_music()
+        else:
+            self.stop_background_music()
+
+    def set_sound_enabled(self, enabled):
+        self.sound_enabled = enabled
+        if not enabled:
+            self.stop_all_sounds()
+
+    @traced('SoundManager.load_sounds', 'audio')
     def load_sounds(self):
+        """Load every effect's voices; safe on a worker thread"""
         assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'sounds')
-        
+        sounds = {}
+
         for sound_name, filename in self.sound_files.items():
             sound_path = os.path.join(assets_dir, filename)
-            
-            # Create placeholder sound file if it doesn't exist
+
             if not os.path.exists(sound_path):
-                self.create_placeholder_sound(sound_path)
-            
+                Logger.warning(f"SoundManager: Sound file not found: {sound_path}")
+                continue
+
             try:
-                sound = SoundLoader.load(sound_path)
-                if sound:
-                    self.sounds[sound_name] = sound
-                    Logger.info(f"SoundManager: Loaded {sound_name}")
+                voices = []
+                for _ in range(SOUND_VOICES.get(sound_name, DEFAULT_VOICES)):
+                    sound = SoundLoader.load(sound_path)
+                    if not sound:
+                        break
+                    sound.volume = self.volume
+                    voices.append(sound)
+                if voices:
+                    sounds[sound_name] = voices
+                    Logger.info(f"SoundManager: Loaded {sound_name} ({len(voices)} voices)")
                 else:
                     Logger.warning(f"SoundManager: Failed to load {sound_name}")
             except Exception as e:
                 Logger.error(f"SoundManager: Error loading {sound_name}: {e}")
+
+        # Swapped in whole so the main thread never sees a half-filled pool
+        self.next_voice = {sound_name: 0 for sound_name in sounds}
+        self.sounds = sounds
     
     # def create_placeholder_sound(self, sound_path):
     #     """Create a placeholder sound file"""
@@ -91,33 +166,44 @@ class SoundManager:
     #     except Exception as e:
     #         Logger.error(f"SoundManager: Error creating placeholder sound: {e}")
     
+    @traced('SoundManager.play_sound', 'audio')
     def play_sound(self, sound_name):
-        """Play a sound effect"""
+        """Play a sound effect on a free voice, stealing the oldest if all are busy"""
+        if not self.sound_enabled:
+            return
+        voices = self.sounds.get(sound_name)
+        if not voices:
+            return
+
+        now = time.perf_counter()
+        if now - self.last_played.get(sound_name, -1.0) < SOUND_MIN_INTERVAL.get(sound_name, DEFAULT_MIN_INTERVAL):
+            return
+        self.last_played[sound_name] = now
+
         try:
-            # Check if sound is enabled
-            app = App.get_running_app()
-            if app and hasattr(app, 'data_manager'):
-                if not app.data_manager.get_sound_enabled():
-                    return
-                
-                volume = app.data_manager.get_volume()
-            else:
-                volume = 0.8
-            
-            if sound_name in self.sounds and self.sounds[sound_name]:
-                sound = self.sounds[sound_name]
-                sound.volume = volume
-                sound.play()
-                Logger.debug(f"SoundManager: Played {sound_name}")
+            # Voices are started in turn, so the next one is free or the oldest playing
+            start = self.next_voice[sound_name]
+            count = len(voices)
+            index = start
+            for offset in range(count):
+                if voices[(start + offset) % count].state != 'play':
+                    index = (start + offset) % count
+                    break
+            sound = voices[index]
+            self.next_voice[sound_name] = (index + 1) % count
+            if sound.state == 'play':
+                sound.stop()
+            sound.play()
         except Exception as e:
             Logger.error(f"SoundManager: Error playing {sound_name}: {e}")
-    
+
     def stop_all_sounds(self):
         """Stop all currently playing sounds"""
         try:
-            for sound in self.sounds.values():
-                if sound:
-                    sound.stop()
+            for voices in self.sounds.values():
+                for sound in voices:
+                    if sound.state == 'play':
+                        sound.stop()
         except Exception as e:
             Logger.error(f"SoundManager: Error stopping sounds: {e}")
     
@@ -125,10 +211,11 @@ class SoundManager:
         """Set volume for all sounds and background music"""
         try:
             volume = max(0.0, min(1.0, volume))
-            
+            self.volume = volume
+
             # Cập nhật sound effect
-            for sound in self.sounds.values():
-                if sound:
+            for voices in self.sounds.values():
+                for sound in voices:
                     sound.volume = volume
             
             # Cập nhật background music nếu đang phát
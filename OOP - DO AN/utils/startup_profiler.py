@@ -0,0 +1,117 @@
+"""
+Startup Profiler for When Cows Fly
+Records how long each module takes to import and when startup milestones
+(build, on_start, first frame, first interactive frame) are reached,
+then writes a JSON report and checks it against STARTUP_BUDGET_MS.
+
+main.py imports this before anything else; set WHENCOWSFLY_STARTUP_PROFILE=1
+to turn it on. Kivy is only imported lazily here so it is timed too.
+"""
+
+import builtins
+import json
+import sys
+import threading
+import time
+
+from utils.file_utils import ensure_parent_dir
+
+# Release startup budget: milliseconds from the first import in main.py
+STARTUP_BUDGET_MS = {
+    'imports_done': 1500,
+    'build_done': 1800,
+    'first_frame': 2000,
+    'first_interactive': 4000,
+}
+REPORT_TOP_IMPORTS = 30
+
+
+class StartupProfiler:
+    """Import timings and startup milestones; does nothing unless started"""
+
+    def __init__(self):
+        self.enabled = False
+        self.clock = time.perf_counter
+        self.origin = self.clock()
+        self.milestones = {}
+        # Module name -> (cumulative seconds, self seconds)
+        self.imports = {}
+        self._stack = []
+        self._original_import = None
+
+    def start(self):
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop_import_timing(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        # Only first-time absolute imports on the main thread are timed
+        if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+            return original(name, globals, locals, fromlist, level)
+        start = self.clock()
+        self._stack.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = self.clock() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports[name] = (elapsed, elapsed - children)
+
+    def mark(self, name):
+        if self.enabled and name not in self.milestones:
+            self.milestones[name] = (self.clock() - self.origin) * 1000
+
+    def mark_next_frame(self, name, callback=None):
+        """Mark name when the next frame has been drawn, then call callback"""
+        if not self.enabled:
+            return
+        from kivy.core.window import Window
+
+        def on_flip(*args):
+            Window.unbind(on_flip=on_flip)
+            self.mark(name)
+            if callback:
+                callback()
+        Window.bind(on_flip=on_flip)
+
+    def report(self):
+        over_budget = {name: {'ms': round(self.milestones[name], 1), 'budget_ms': budget}
+                       for name, budget in STARTUP_BUDGET_MS.items()
+                       if name in self.milestones and self.milestones[name] > budget}
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            'milestones_ms': {name: round(ms, 1) for name, ms in self.milestones.items()},
+            'budget_ms': STARTUP_BUDGET_MS,
+            'over_budget': over_budget,
+            'imports_ms': [{'module': name, 'cumulative': round(total * 1000, 2), 'self': round(own * 1000, 2)}
+                           for name, (total, own) in slowest[:REPORT_TOP_IMPORTS]],
+            'modules_imported': len(self.imports),
+        }
+
+    def save(self, path):
+        """Write the report, log its summary and stop timing imports"""
+        from kivy.logger import Logger
+
+        self.stop_import_timing()
+        report = self.report()
+        ensure_parent_dir(path)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        summary = '  '.join(f"{name} {ms:.0f}" for name, ms in report['milestones_ms'].items())
+        Logger.info(f"StartupProfiler: {summary} (ms); report written to {path}")
+        for name, over in report['over_budget'].items():
+            Logger.warning(f"StartupProfiler: {name} at {over['ms']:.0f} ms is over its {over['budget_ms']} ms budget")
+        return report
+
+
+# Shared profiler for the app's startup
+startup_profiler = StartupProfiler()
@@ -0,0 +1,267 @@
+"""
+Storage for When Cows Fly
+Backends that persist DataManager's data: a JSON save file with an event
+journal, or a SQLite database with profile, settings, inventory and runs
+tables.
+
+A backend provides:
+    load()            -> (data dict or None if nothing is saved, events to replay on it)
+    append(events)    -> True once the change events are stored; called on
+                         DataManager's writer thread with a batch of them
+    needs_save()      -> True when a full save is due
+    serialize(data)   -> snapshot of the data, taken under DataManager's lock
+    save(snapshot)    -> writes a snapshot from serialize()
+    recent_runs(limit)
+    close()
+
+Set WHENCOWSFLY_STORAGE=json to use the JSON file instead of SQLite.
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from kivy.logger import Logger
+
+from utils.event_journal import EventJournal
+from utils.file_utils import ensure_parent_dir
+
+STORAGE_ENV = 'WHENCOWSFLY_STORAGE'
+# Journal events between full saves of the JSON file
+COMPACT_EVERY = 50
+
+
+def create_storage(data_file):
+    """Backend chosen by WHENCOWSFLY_STORAGE; SQLite unless it is 'json'"""
+    json_storage = JsonStorage(data_file)
+    if os.environ.get(STORAGE_ENV, 'sqlite') == 'json':
+        return json_storage
+    # An existing JSON save is imported on the first run with SQLite
+    return SqliteStorage(os.path.splitext(data_file)[0] + '.db', legacy=json_storage)
+
+
+class JsonStorage:
+    """Whole save as one JSON file, with changes appended to an EventJournal
+
+    The file records the last journal sequence number it includes; events
+    past it are replayed on load, and the journal is compacted after
+    every save.
+    """
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.journal = EventJournal(os.path.splitext(data_file)[0] + '.journal')
+
+    def load(self):
+        data = None
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r') as f:
+                data = json.load(f)
+        seq = data.pop('journal_seq', 0) if data else 0
+        try:
+            events = self.journal.replay(seq)
+        except Exception as e:
+            Logger.error(f"JsonStorage: Error reading journal: {e}")
+            events = []
+        return data, events
+
+    def append(self, events):
+        return self.journal.append(events)
+
+    def needs_save(self):
+        return self.journal.pending >= COMPACT_EVERY
+
+    def serialize(self, data):
+        return self.journal.seq, json.dumps({**data, 'journal_seq': self.journal.seq}, indent=2)
+
+    def save(self, snapshot):
+        """Atomically replace the save file, then drop the journal events it includes"""
+        journal_seq, payload = snapshot
+        ensure_parent_dir(self.data_file)
+        temp_file = self.data_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.data_file)
+        Logger.info(f"JsonStorage: Saved to {self.data_file}")
+        self.journal.compact(journal_seq)
+
+    def recent_runs(self, limit):
+        # Run history is only kept by SqliteStorage
+        return []
+
+    def close(self):
+        self.journal.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    best_score INTEGER NOT NULL DEFAULT 0,
+    total_points INTEGER NOT NULL DEFAULT 0,
+    equipped_skin TEXT,
+    equipped_background TEXT
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY,
+    item_id TEXT NOT NULL UNIQUE,
+    cost INTEGER NOT NULL DEFAULT 0,
+    purchased_at REAL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score);
+"""
+
+EQUIP_COLUMNS = {'skin': 'equipped_skin', 'background': 'equipped_background'}
+
+
+class SqliteStorage:
+    """SQLite database in WAL mode; each batch of change events is one transaction
+
+    Changes are stored as they happen, so full saves are only needed when
+    importing a JSON save or after an event could not be stored.
+    """
+
+    def __init__(self, db_file, legacy=None):
+        self.db_file = db_file
+        self.legacy = legacy
+        self.save_needed = False
+        # The connection is shared with DataManager's writer thread
+        self._lock = threading.Lock()
+        ensure_parent_dir(db_file)
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # With WAL, NORMAL only syncs at checkpoints and stays crash-safe
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def load(self):
+        with self._lock:
+            profile = self.conn.execute(
+                'SELECT best_score, total_points, equipped_skin, equipped_background FROM profile').fetchone()
+            if profile is None:
+                if self.legacy is not None and os.path.exists(self.legacy.data_file):
+                    return self._import_legacy()
+                return None, []
+            settings = {key: json.loads(value) for key, value in self.conn.execute('SELECT key, value FROM settings')}
+            purchased = [row[0] for row in self.conn.execute('SELECT item_id FROM inventory ORDER BY id')]
+        return {
+            'best_score': profile[0],
+            'total_points': profile[1],
+            'purchased_items': purchased,
+            'equipped_skin': profile[2],
+            'equipped_background': profile[3],
+            'settings': settings,
+        }, []
+
+    def _import_legacy(self):
+        """Copy the JSON save and its journal into the database; caller holds _lock
+
+        The import is written before load() returns, in one transaction, so
+        a change stored right after it can never land on an empty profile.
+        """
+        Logger.info(f"SqliteStorage: Importing {self.legacy.data_file}")
+        data, events = self.legacy.load()
+        try:
+            with self.conn:
+                self._write(data or {})
+                for event in events:
+                    self._apply(event)
+        except (sqlite3.Error, KeyError) as e:
+            Logger.error(f"SqliteStorage: Error importing {self.legacy.data_file}: {e}")
+            self.save_needed = True
+        return data, events
+
+    def append(self, events):
+        try:
+            with self._lock, self.conn:
+                for event in events:
+                    self._apply(event)
+            return True
+        except (sqlite3.Error, KeyError) as e:
+            Logger.error(f"SqliteStorage: Error storing events: {e}")
+            self.save_needed = True
+            return False
+
+    def _apply(self, event):
+        execute = self.conn.execute
+        execute('INSERT OR IGNORE INTO profile (id) VALUES (0)')
+        kind = event['type']
+        if kind == 'points':
+            execute('UPDATE profile SET total_points = total_points + ?', (event['amount'],))
+        elif kind == 'best_score':
+            execute('UPDATE profile SET best_score = MAX(best_score, ?)', (event['score'],))
+        elif kind == 'run':
+            execute('UPDATE profile SET best_score = MAX(best_score, ?), total_points = total_points + ?',
+                    (event['score'], event['points']))
+            execute('INSERT INTO runs (score, points, played_at) VALUES (?, ?, ?)',
+                    (event['score'], event['points'], event['time']))
+        elif kind == 'purchase':
+            execute('UPDATE profile SET total_points = total_points - ?', (event['cost'],))
+            execute('INSERT OR IGNORE INTO inventory (item_id, cost, purchased_at) VALUES (?, ?, ?)',
+                    (event['item'], event['cost'], time.time()))
+        elif kind == 'equip':
+            execute(f"UPDATE profile SET {EQUIP_COLUMNS[event['slot']]} = ?", (event['item'],))
+        elif kind == 'setting':
+            execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                    (event['key'], json.dumps(event['value'])))
+        elif kind == 'reset':
+            execute('UPDATE profile SET best_score = 0, total_points = 0, '
+                    'equipped_skin = NULL, equipped_background = NULL')
+            execute('DELETE FROM settings')
+            execute('DELETE FROM inventory')
+            execute('DELETE FROM runs')
+
+    def needs_save(self):
+        return self.save_needed
+
+    def serialize(self, data):
+        return copy.deepcopy(data)
+
+    def save(self, data):
+        """Replace profile, settings and inventory with the given data"""
+        with self._lock, self.conn:
+            self._write(data)
+        self.save_needed = False
+        Logger.info(f"SqliteStorage: Saved to {self.db_file}")
+
+    def _write(self, data):
+        """Replace profile, settings and inventory rows; caller holds a transaction"""
+        execute = self.conn.execute
+        execute('INSERT OR REPLACE INTO profile (id, best_score, total_points, equipped_skin, equipped_background) '
+                'VALUES (0, ?, ?, ?, ?)',
+                (data.get('best_score', 0), data.get('total_points', 0),
+                 data.get('equipped_skin'), data.get('equipped_background')))
+        execute('DELETE FROM settings')
+        self.conn.executemany('INSERT INTO settings (key, value) VALUES (?, ?)',
+                              [(key, json.dumps(value)) for key, value in data.get('settings', {}).items()])
+        purchased = set(data.get('purchased_items', []))
+        stored = [row[0] for row in execute('SELECT item_id FROM inventory')]
+        self.conn.executemany('DELETE FROM inventory WHERE item_id = ?',
+                              [(item_id,) for item_id in stored if item_id not in purchased])
+        self.conn.executemany('INSERT OR IGNORE INTO inventory (item_id) VALUES (?)',
+                              [(item_id,) for item_id in data.get('purchased_items', [])])
+
+    def recent_runs(self, limit):
+        """Latest runs first, as dicts with score, points and played_at"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT score, points, played_at FROM runs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [{'score': score, 'points': points, 'played_at': played_at} for score, points, played_at in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
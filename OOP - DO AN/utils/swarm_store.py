@@ -0,0 +1,142 @@
+"""
+Swarm Store for When Cows Fly
+Structure-of-arrays storage for large numbers of kites and birds, moved,
+culled and collision-tested in vectorized NumPy passes.
+NumPy is optional: only the swarm mode needs it.
+"""
+
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from utils.game_world import GROUND_LEVEL
+
+# Type codes stored in the kind array
+KITE = 0
+BIRD = 1
+SWARM_TYPES = {'kite': KITE, 'bird': BIRD}
+
+KITE_MAX_FALL_SPEED = -100
+
+
+def numpy_available():
+    return np is not None
+
+
+class SwarmStore:
+    """Kites and birds as parallel arrays instead of one object each
+
+    Only the first count slots are live. Culled and hit entities are
+    removed by compacting the arrays, so the order of survivors is kept.
+    """
+
+    FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'width', 'height',
+              'speed', 'velocity_y', 'gravity', 'drift')
+
+    def __init__(self, capacity=256):
+        if np is None:
+            raise RuntimeError("SwarmStore needs numpy, which is not installed")
+        self.capacity = capacity
+        self.count = 0
+        for field in self.FIELDS:
+            setattr(self, field, np.zeros(capacity))
+        self.kind = np.zeros(capacity, dtype=np.int8)
+
+    def clear(self):
+        self.count = 0
+
+    def _grow(self):
+        self.capacity *= 2
+        for field in self.FIELDS + ('kind',):
+            old = getattr(self, field)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, field, new)
+
+    def spawn(self, obstacle_type, world_width, world_height, rng=random):
+        """Add a kite or bird with the same start values as ObstacleState"""
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.kind[i] = SWARM_TYPES[obstacle_type]
+        self.velocity_y[i] = 0
+        if obstacle_type == 'kite':
+            self.width[i], self.height[i] = 30, 40
+            self.x[i] = world_width * rng.uniform(0.4, 0.7)
+            self.y[i] = world_height - rng.randint(50, 100)
+            self.speed[i] = 200
+            self.gravity[i] = 200 * rng.uniform(0.8, 1)
+            self.drift[i] = rng.uniform(50, 100)
+        else:
+            self.width[i], self.height[i] = 35, 25
+            self.x[i] = world_width
+            self.y[i] = rng.randint(GROUND_LEVEL + 40, world_height - 80)
+            self.speed[i] = 2000
+            self.gravity[i] = 0
+            self.drift[i] = 0
+        self.prev_x[i] = self.x[i]
+        self.prev_y[i] = self.y[i]
+        self.count += 1
+        return i
+
+    def step(self, dt, speed_multiplier=1.0):
+        """Move every entity and drop the ones that left the screen"""
+        n = self.count
+        if not n:
+            return 0
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+
+        x -= (self.speed[:n] * speed_multiplier + self.drift[:n]) * dt
+        # Only kites have gravity; birds keep velocity_y at 0
+        velocity_y = self.velocity_y[:n]
+        velocity_y -= self.gravity[:n] * dt
+        np.maximum(velocity_y, KITE_MAX_FALL_SPEED, out=velocity_y)
+        y += velocity_y * dt
+
+        return self.remove(x < -self.width[:n])
+
+    def overlapping(self, left, bottom, right, top):
+        """Mask of live entities touching the box (inclusive, like collide_widget)"""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return ((x + self.width[:n] >= left) & (x <= right)
+                & (y + self.height[:n] >= bottom) & (y <= top))
+
+    def remove(self, mask):
+        """Remove the entities selected by a boolean mask; returns how many"""
+        removed = int(np.count_nonzero(mask))
+        if removed:
+            keep = ~mask
+            n = self.count
+            kept = n - removed
+            for field in self.FIELDS + ('kind',):
+                array = getattr(self, field)
+                array[:kept] = array[:n][keep]
+            self.count = kept
+        return removed
+
+    def quads(self, kind, alpha=1.0):
+        """Interpolated quad vertices (x, y, u, v) and indices for one type"""
+        n = self.count
+        mask = self.kind[:n] == kind
+        px, x = self.prev_x[:n][mask], self.x[:n][mask]
+        py, y = self.prev_y[:n][mask], self.y[:n][mask]
+        x0 = px + (x - px) * alpha
+        y0 = py + (y - py) * alpha
+        x1 = x0 + self.width[:n][mask]
+        y1 = y0 + self.height[:n][mask]
+
+        k = len(x0)
+        vertices = np.zeros((k, 4, 4))
+        vertices[:, 0, 0], vertices[:, 0, 1] = x0, y0
+        vertices[:, 1, 0], vertices[:, 1, 1] = x1, y0
+        vertices[:, 2, 0], vertices[:, 2, 1] = x1, y1
+        vertices[:, 3, 0], vertices[:, 3, 1] = x0, y1
+        base = np.arange(k, dtype=np.int64)[:, None] * 4
+        indices = base + np.array([0, 1, 2, 2, 3, 0])
+        return vertices.ravel(), indices.ravel()
@@ -0,0 +1,221 @@
+"""
+Texture Cache for When Cows Fly
+Keeps decoded image textures within a byte budget, evicting the least
+recently used ones first. Textures pinned to a slot (the equipped skin
+and background) are never evicted while pinned.
+
+Textures are loaded with nocache=True so Kivy's own image cache does not
+keep evicted textures alive; widgets take them through their texture
+property instead of source. Images, and the pages of atlases, can be
+decoded on a worker thread with decode() and handed over with adopt() on
+the main thread, which only has to upload them.
+
+An atlas:// texture is a region of an atlas page, and Kivy keeps the
+whole atlas loaded in its 'kv.atlas' cache. So the pages of an atlas are
+counted once, while any of its regions is cached, and the atlas is
+dropped from Kivy's cache when its last region is evicted.
+"""
+
+import json
+import os
+from collections import OrderedDict
+
+from kivy.cache import Cache
+from kivy.core.image import Image as CoreImage
+from kivy.logger import Logger
+
+DEFAULT_BUDGET_BYTES = 96 * 1024 * 1024
+# Decoded textures are RGBA
+BYTES_PER_PIXEL = 4
+ATLAS_PREFIX = 'atlas://'
+
+
+def atlas_path(source):
+    """'assets/build/hd/atlas/characters' for 'atlas://assets/build/hd/atlas/characters/bo_0'"""
+    return source[len(ATLAS_PREFIX):].rsplit('/', 1)[0]
+
+
+def texture_bytes(texture):
+    return texture.width * texture.height * BYTES_PER_PIXEL
+
+
+class PreloadedAtlas:
+    """Atlas built from pages decoded off the main thread
+
+    Has the textures, original_textures and item lookup Kivy's image
+    loader uses, so it can sit in Cache('kv.atlas') next to atlases Kivy
+    loaded itself and atlas:// sources of Image widgets share it.
+    """
+
+    def __init__(self, meta, pages):
+        self.textures = {}
+        self.original_textures = []
+        for page_name, ids in meta.items():
+            page = pages[page_name].texture
+            self.original_textures.append(page)
+            for uid, coords in ids.items():
+                self.textures[uid] = page.get_region(*coords)
+
+    def __getitem__(self, uid):
+        return self.textures[uid]
+
+
+class TextureCache:
+    """LRU cache of textures by source path, bounded by resident bytes"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        # Source -> (texture, group), least recently used first
+        self.entries = OrderedDict()
+        # Group -> [bytes, cached sources]; a group is one image, or one atlas
+        # whose pages stay resident while any of its regions is cached
+        self.groups = {}
+        # Slot name -> pinned source
+        self.pinned = {}
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.evict()
+
+    def get(self, source):
+        """Texture for source, loading it on a miss; None if it cannot be loaded"""
+        entry = self.entries.get(source)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(source)
+            return entry[0]
+
+        self.misses += 1
+        try:
+            texture = CoreImage(source, nocache=True).texture
+        except Exception as e:
+            Logger.error(f"TextureCache: Could not load {source}: {e}")
+            return None
+        return self._insert(source, texture)
+
+    def decode(self, source):
+        """Decode an image without creating its texture; safe off the main thread
+
+        For an atlas:// source every page of its atlas is decoded, and
+        (atlas meta, {page file: image}) is returned. Returns None when
+        there is nothing left to decode.
+        """
+        if source in self.entries:
+            return None
+        if not source.startswith(ATLAS_PREFIX):
+            return CoreImage(source, nocache=True)
+        path = atlas_path(source)
+        if Cache.get('kv.atlas', path) is not None:
+            return None
+        with open(path + '.atlas', 'r') as f:
+            meta = json.load(f)
+        directory = os.path.dirname(path)
+        return meta, {page_name: CoreImage(os.path.join(directory, page_name), nocache=True)
+                      for page_name in meta}
+
+    def adopt(self, source, decoded):
+        """Cache the texture of an image from decode(); main thread only
+
+        Only uploads textures and cuts atlas regions; the decoding is done.
+        """
+        if decoded is None or source in self.entries:
+            return self.get(source)
+        if not source.startswith(ATLAS_PREFIX):
+            self.misses += 1
+            return self._insert(source, decoded.texture)
+
+        path = atlas_path(source)
+        if Cache.get('kv.atlas', path) is None:
+            Cache.append('kv.atlas', path, PreloadedAtlas(*decoded))
+        # Kivy's loader now finds the atlas in its cache, so this only looks the region up
+        return self.get(source)
+
+    def _insert(self, source, texture):
+        group = atlas_path(source) if source.startswith(ATLAS_PREFIX) else source
+        if group not in self.groups:
+            size = self._atlas_bytes(group, texture) if group != source else texture_bytes(texture)
+            self.groups[group] = [size, set()]
+            self.resident_bytes += size
+        self.groups[group][1].add(source)
+        self.entries[source] = (texture, group)
+        self.evict()
+        return texture
+
+    def _atlas_bytes(self, path, region):
+        """Bytes of all pages of the atlas holding region"""
+        atlas = Cache.get('kv.atlas', path)
+        pages = atlas.original_textures if atlas is not None else [region.owner]
+        return sum(texture_bytes(page) for page in pages)
+
+    def _remove(self, source):
+        texture, group = self.entries.pop(source)
+        size, sources = self.groups[group]
+        sources.discard(source)
+        if sources:
+            return
+        del self.groups[group]
+        self.resident_bytes -= size
+        if group != source:
+            self._drop_atlas(group)
+
+    def _drop_atlas(self, path):
+        """Let Kivy free an atlas none of whose regions are cached any more"""
+        atlas = Cache.get('kv.atlas', path)
+        if atlas is None:
+            return
+        Cache.remove('kv.atlas', path)
+        for uid in atlas.textures:
+            Cache.remove('kv.texture', f'{ATLAS_PREFIX}{path}/{uid}|0|0')
+
+    def pin(self, slot, source):
+        """Keep source loaded while it fills slot; returns its texture"""
+        self.pinned[slot] = source
+        texture = self.get(source)
+        # A new pin may have released the previous texture in this slot
+        self.evict()
+        return texture
+
+    def unpin(self, slot):
+        self.pinned.pop(slot, None)
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used unpinned textures until within budget"""
+        if self.resident_bytes <= self.budget_bytes:
+            return
+        pinned = set(self.pinned.values())
+        for source in list(self.entries):
+            if self.resident_bytes <= self.budget_bytes:
+                break
+            if source in pinned:
+                continue
+            self._remove(source)
+            self.evictions += 1
+
+    def clear(self):
+        pinned = set(self.pinned.values())
+        for source in list(self.entries):
+            if source not in pinned:
+                self._remove(source)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'textures': len(self.entries),
+            'atlases': sum(1 for group in self.groups if group not in self.entries),
+            'resident_bytes': self.resident_bytes,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'pinned': dict(self.pinned),
+        }
+
+
+# Shared cache for the whole app
+texture_cache = TextureCache()
@@ -0,0 +1,95 @@
+"""
+Thumbnail Cache for When Cows Fly
+Makes small previews of shop images on a worker thread and keeps them on
+disk, keyed by the source path, size and modification time, so each one
+is only generated once per changed source image. request() never touches
+the disk itself: it is called for every row bind while the shop scrolls.
+
+Needs Pillow; without it request() always returns None and callers keep
+showing their placeholder.
+"""
+
+import hashlib
+import os
+import queue
+import threading
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+from utils.file_utils import ensure_dir
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+THUMBNAIL_SIZE = (128, 128)
+
+
+class ThumbnailCache:
+    """Generates thumbnails in the background and remembers finished ones"""
+
+    def __init__(self, cache_dir, size=THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.size = size
+        # Source path -> thumbnail path, for thumbnails known to be on disk
+        self.ready = {}
+        self.pending = set()
+        # Sources that are missing or could not be read; not tried again
+        self.failed = set()
+        # Newest requests first: those are the rows currently on screen
+        self.requests = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._worker = None
+        if Image is None:
+            Logger.warning("ThumbnailCache: Pillow not installed, shop thumbnails disabled")
+
+    def thumbnail_path(self, source):
+        stat = os.stat(source)
+        key = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}:{self.size[0]}x{self.size[1]}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.png')
+
+    def request(self, source, callback):
+        """Return the thumbnail path if it is ready; otherwise queue it and
+        call callback(source, path) on the main thread once it is"""
+        if Image is None:
+            return None
+        with self._lock:
+            path = self.ready.get(source)
+            if path or source in self.pending or source in self.failed:
+                return path
+            self.pending.add(source)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name='ThumbnailWorker', daemon=True)
+                self._worker.start()
+        self.requests.put((source, callback))
+        return None
+
+    def _work(self):
+        while True:
+            source, callback = self.requests.get()
+            try:
+                path = self.thumbnail_path(source)
+                if not os.path.exists(path):
+                    self.generate(source, path)
+            except Exception as e:
+                Logger.warning(f"ThumbnailCache: Could not make thumbnail for {source}: {e}")
+                path = None
+            with self._lock:
+                self.pending.discard(source)
+                if path:
+                    self.ready[source] = path
+                else:
+                    self.failed.add(source)
+            if path:
+                Clock.schedule_once(lambda dt, s=source, p=path: callback(s, p))
+
+    def generate(self, source, path):
+        ensure_dir(self.cache_dir)
+        with Image.open(source) as image:
+            image.draft('RGBA', self.size)
+            image.thumbnail(self.size)
+            temp_path = path + '.tmp'
+            image.save(temp_path, 'PNG')
+        os.replace(temp_path, path)
@@ -0,0 +1,132 @@
+"""
+Tracer for When Cows Fly
+Records named spans of a session as Chrome trace events, viewable in
+chrome://tracing or https://ui.perfetto.dev
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+from utils.file_utils import ensure_parent_dir
+
+
+class Tracer:
+    """Collects trace events while enabled; does nothing otherwise
+
+    Use the traced() decorator on functions, span() as a context manager
+    for blocks, and async_begin()/async_end() for things that start and end
+    in different callbacks, such as screen transitions.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.pid = os.getpid()
+        self.clock = time.perf_counter
+        self.origin = self.clock()
+
+    def start(self):
+        """Start a new recording"""
+        self.events = []
+        self.origin = self.clock()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def now_us(self):
+        return (self.clock() - self.origin) * 1e6
+
+    def complete(self, name, start_us, end_us, category='game', args=None):
+        event = {
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': start_us, 'dur': end_us - start_us,
+            'pid': self.pid, 'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def instant(self, name, category='game', args=None):
+        event = {
+            'name': name, 'cat': category, 'ph': 'i', 's': 't',
+            'ts': self.now_us(), 'pid': self.pid, 'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def async_begin(self, name, span_id, category='game'):
+        if self.enabled:
+            self.events.append({'name': name, 'cat': category, 'ph': 'b', 'id': span_id,
+                                'ts': self.now_us(), 'pid': self.pid, 'tid': threading.get_ident()})
+
+    def async_end(self, name, span_id, category='game'):
+        if self.enabled:
+            self.events.append({'name': name, 'cat': category, 'ph': 'e', 'id': span_id,
+                                'ts': self.now_us(), 'pid': self.pid, 'tid': threading.get_ident()})
+
+    def span(self, name, category='game'):
+        """Context manager timing a block; free when tracing is off"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category)
+
+    def save(self, path):
+        """Write the recorded events as a Chrome trace JSON file"""
+        ensure_parent_dir(path)
+        thread_names = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': thread.ident,
+                         'args': {'name': thread.name}} for thread in threading.enumerate()]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': thread_names + self.events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+class _Span:
+    def __init__(self, tracer, name, category):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = self.tracer.now_us()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.start, self.tracer.now_us(), self.category)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# Shared tracer for the whole app
+tracer = Tracer()
+
+
+def traced(name=None, category='game'):
+    """Decorator recording each call as a span while tracing is on"""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start = tracer.now_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.complete(span_name, start, tracer.now_us(), category)
+        return wrapper
+    return decorate